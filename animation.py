@@ -0,0 +1,186 @@
+import math
+import time
+
+IDLE_POLL_INTERVAL_MS = 250  # Poll period for a polled input while nothing is moving
+POLL_HOLD_SECONDS = 1.0  # How long polling stays at the frame rate after the input last changed
+
+
+class CriticallyDampedValue:
+    # A value that follows its target like a critically damped spring: it never
+    # overshoots, and the closed-form step is exact for any dt, so a late frame
+    # lands exactly where several on-time frames would have
+    __slots__ = ("value", "velocity", "target", "omega", "epsilon")
+
+    def __init__(self, value=0.0, omega=12.0, epsilon=0.01):
+        self.value = float(value)
+        self.velocity = 0.0
+        self.target = float(value)
+        self.omega = omega
+        self.epsilon = epsilon
+
+    @property
+    def settled(self):
+        return self.value == self.target and self.velocity == 0.0
+
+    def step(self, dt):
+        if self.settled:
+            return False
+        omega = self.omega
+        offset = self.value - self.target
+        decay = math.exp(-omega * dt)
+        temp = (self.velocity + omega * offset) * dt
+        offset = (offset + temp) * decay
+        self.velocity = (self.velocity - omega * temp) * decay
+        if abs(offset) < self.epsilon and abs(self.velocity) < self.epsilon * omega:
+            # Close enough to be invisible: snap so the engine can go idle
+            self.value = self.target
+            self.velocity = 0.0
+            return False
+        self.value = self.target + offset
+        return True
+
+
+class AnimationEngine:
+    # Advances every animated channel by the wall-clock time since the previous
+    # frame, so motion speed doesn't depend on how often frames actually run
+    def __init__(self, target_fps=60, max_step=0.25):
+        self.channels = {}
+        self.target_fps = target_fps
+        self.frame_interval = 1.0 / target_fps
+        self.max_step = max_step
+        self.last_time = None
+        self.frames = 0
+        self.dropped_frames = 0
+
+    def add(self, name, value=0.0, omega=12.0, epsilon=0.01):
+        self.channels[name] = CriticallyDampedValue(value, omega, epsilon)
+
+    def set_target(self, name, target):
+        self.channels[name].target = float(target)
+
+    def value(self, name):
+        return self.channels[name].value
+
+    @property
+    def active(self):
+        return any(not channel.settled for channel in self.channels.values())
+
+    def resume(self):
+        # Call when starting again after being idle, so the idle time isn't one giant step
+        self.last_time = None
+
+    def tick(self, now=None):
+        # Returns the elapsed time the frame covered
+        if now is None:
+            now = time.monotonic()
+        dt = self.frame_interval if self.last_time is None else now - self.last_time
+        self.last_time = now
+        self.frames += 1
+        # Frames that should have happened in between were dropped; the exact
+        # spring step covers the gap, but a stall longer than max_step is clipped
+        missed = int(dt / self.frame_interval + 0.5) - 1
+        if missed > 0:
+            self.dropped_frames += missed
+        dt = min(dt, self.max_step)
+        for channel in self.channels.values():
+            channel.step(dt)
+        return dt
+
+
+class FrameScheduler:
+    # Picks how often frames run from the cluster state, so nothing ticks when
+    # nothing can change:
+    #   off     the car is off and the scene is covered by the overlay: no frames
+    #   idle    nothing is moving: repaint only when data arrives
+    #   moving  needles or lane dashes are in motion: frames at the target rate
+    # The frame timer is anything with start(), stop() and isActive(), e.g. a QTimer.
+    # A polled input (shared memory) can be put under the scheduler too: it is
+    # polled at the frame rate while moving or shortly after it last changed,
+    # and every IDLE_POLL_INTERVAL_MS otherwise.
+    MODES = ("off", "idle", "moving")
+
+    def __init__(self, timer, engine):
+        self.timer = timer
+        self.engine = engine
+        self.mode = "off"
+        self.wakeups = {"data": 0, "frame": 0, "poll": 0}
+        self.poll_timer = None
+        self.poll_interval = None
+        self.idle_poll_interval = IDLE_POLL_INTERVAL_MS
+        self._last_input_change = None
+        self.mode_changes = 0
+        self.time_in_mode = dict.fromkeys(self.MODES, 0.0)
+        self._mode_since = time.monotonic()
+
+    def choose(self, car_on, road_moving):
+        if not car_on:
+            return "off"
+        if road_moving or self.engine.active:
+            return "moving"
+        return "idle"
+
+    def wake(self, car_on, road_moving):
+        # New data was applied; takes effect immediately rather than on the next tick
+        self.wakeups["data"] += 1
+        return self.schedule(self.choose(car_on, road_moving))
+
+    def frame(self, car_on, road_moving):
+        # Called after each frame has advanced the animation
+        self.wakeups["frame"] += 1
+        return self.schedule(self.choose(car_on, road_moving))
+
+    def attach_poll(self, timer, interval, idle_interval=IDLE_POLL_INTERVAL_MS):
+        # timer: anything with start(), setInterval() and interval(), e.g. a QTimer
+        # running the poll; interval is the frame-rate period in ms
+        self.poll_timer = timer
+        self.poll_interval = interval
+        self.idle_poll_interval = idle_interval
+        self._update_poll()
+        timer.start()
+
+    def polled(self, changed):
+        # Called after each poll with whether the input had changed
+        self.wakeups["poll"] += 1
+        if changed:
+            self._last_input_change = time.monotonic()
+        self._update_poll()
+
+    def _update_poll(self):
+        if self.poll_timer is None:
+            return
+        recent = self._last_input_change is not None and time.monotonic() - self._last_input_change < POLL_HOLD_SECONDS
+        interval = self.poll_interval if self.mode == "moving" or recent else self.idle_poll_interval
+        if self.poll_timer.interval() != interval:
+            self.poll_timer.setInterval(interval)
+
+    def schedule(self, mode):
+        if mode != self.mode:
+            now = time.monotonic()
+            self.time_in_mode[self.mode] += now - self._mode_since
+            self._mode_since = now
+            self.mode = mode
+            self.mode_changes += 1
+        if mode == "off":
+            # Nobody can see the needles sweep under the overlay; put them where they are going
+            for channel in self.engine.channels.values():
+                channel.value = channel.target
+                channel.velocity = 0.0
+        if mode == "moving":
+            if not self.timer.isActive():
+                self.engine.resume()
+                self.timer.start()
+        elif self.timer.isActive():
+            self.timer.stop()
+        self._update_poll()
+        return mode
+
+    def summary(self):
+        time_in_mode = dict(self.time_in_mode)
+        time_in_mode[self.mode] += time.monotonic() - self._mode_since
+        return {
+            "mode": self.mode,
+            "wakeups": dict(self.wakeups),
+            "mode_changes": self.mode_changes,
+            "seconds_in_mode": time_in_mode,
+            "poll_interval_ms": self.poll_timer.interval() if self.poll_timer is not None else None,
+        }
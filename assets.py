@@ -0,0 +1,77 @@
+import hashlib
+import os
+import struct
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+# Pre-scaled images cached on disk as raw premultiplied ARGB pixels, so a launch
+# reads one file instead of decoding the source PNG and scaling it. Entries are
+# keyed by the SHA-1 of the source file and the target size; editing an image
+# or changing its size simply misses the cache.
+CACHE_MAGIC = b"ICAS"
+CACHE_HEADER = struct.Struct("<4sIII")  # magic, width, height, bytes per line
+CACHE_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "instrument_cluster", "assets")
+
+
+class AssetCache:
+    # load() is safe to call off the GUI thread: it only produces QImages
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path, width, height, aspect_mode=Qt.KeepAspectRatio):
+        # Returns the scaled image, or None when the source is missing or unreadable
+        try:
+            with open(path, "rb") as source:
+                data = source.read()
+        except OSError:
+            return None
+        cached = os.path.join(self.cache_dir, f"{hashlib.sha1(data).hexdigest()}-{width}x{height}-{int(aspect_mode)}.img")
+        image = self._read(cached)
+        if image is not None:
+            self.hits += 1
+            return image
+        self.misses += 1
+        image = QImage.fromData(data)
+        if image.isNull():
+            return None
+        image = image.scaled(width, height, aspect_mode).convertToFormat(CACHE_FORMAT)
+        self._write(cached, image)
+        return image
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as cached:
+                header = cached.read(CACHE_HEADER.size)
+                if len(header) < CACHE_HEADER.size:
+                    return None
+                magic, width, height, bytes_per_line = CACHE_HEADER.unpack(header)
+                pixels = cached.read()
+        except OSError:
+            return None
+        if magic != CACHE_MAGIC or len(pixels) != bytes_per_line * height:
+            return None
+        # copy() so the image owns its pixels rather than borrowing the bytes object
+        return QImage(pixels, width, height, bytes_per_line, CACHE_FORMAT).copy()
+
+    def _write(self, path, image):
+        # Best effort: a read-only or full cache directory only costs the speed-up
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temporary, "wb") as cached:
+                cached.write(CACHE_HEADER.pack(CACHE_MAGIC, image.width(), image.height(), image.bytesPerLine()))
+                cached.write(image.constBits().asstring(image.bytesPerLine() * image.height()))
+            os.replace(temporary, path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
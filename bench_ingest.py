@@ -0,0 +1,78 @@
+import argparse
+import multiprocessing
+import socket
+import threading
+import time
+
+from ingest import IngestServer
+from protocol import encode_frame
+
+# Load test for IngestServer: N producer processes push binary frames as fast as
+# they can and we measure how many updates per second the single server thread
+# decodes as the producer count grows.
+
+
+def produce(port, duration, batch, start_event):
+    sock = socket.create_connection(("localhost", port))
+    frame = encode_frame([(0x01 + i % 3, i % 200) for i in range(batch)])
+    start_event.wait()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        sock.sendall(frame)
+    sock.close()
+
+
+class Counter:
+    def __init__(self):
+        self.updates = 0
+
+    def on_frames(self, connection, frames):
+        for frame in frames:
+            self.updates += len(frame.updates)
+
+
+def run(producers, duration, batch):
+    counter = Counter()
+    server = IngestServer("localhost", 0, on_frames=counter.on_frames, verbose=False)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    start_event = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=produce, args=(server.port, duration, batch, start_event))
+        for _ in range(producers)
+    ]
+    for process in processes:
+        process.start()
+    while len(server.connections) < producers:
+        time.sleep(0.01)
+
+    start = time.perf_counter()
+    start_event.set()
+    for process in processes:
+        process.join()
+    # Let the server drain whatever is still buffered in the sockets
+    while server.connections:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    server.stop()
+    thread.join()
+    return counter.updates, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ingestion throughput against producer count")
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds each producer sends for")
+    parser.add_argument("--batch", type=int, default=32, help="updates per binary frame")
+    args = parser.parse_args()
+
+    print(f"{'producers':>9} {'updates':>12} {'seconds':>8} {'updates/s':>12}")
+    for producers in args.producers:
+        updates, elapsed = run(producers, args.duration, args.batch)
+        print(f"{producers:>9} {updates:>12} {elapsed:>8.2f} {updates / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
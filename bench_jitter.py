@@ -0,0 +1,132 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Frame-time jitter under heavy input load: runs the cluster with ingestion on a
+# thread and then in a worker process, floods it from producer processes while
+# the road animation keeps the frame timer running, and compares how regularly
+# frames arrive. Each mode runs in a fresh interpreter so they don't interfere.
+
+MODES = ("thread", "process")
+
+
+def produce(port, duration, batch, start_event):
+    from protocol import ADDR_CAR_STATUS, ADDR_FUEL, ADDR_RPM, ADDR_SPEED, encode_frame
+
+    frames = []
+    for i in range(64):
+        updates = [(ADDR_CAR_STATUS, 1)]
+        for k in range(batch - 1):
+            step = i * batch + k
+            updates.append([(ADDR_SPEED, 40 + step % 150), (ADDR_RPM, 1000 + step * 37 % 6000), (ADDR_FUEL, step % 100)][k % 3])
+        frames.append(encode_frame(updates))
+    sock = socket.create_connection(("localhost", port))
+    start_event.wait()
+    deadline = time.perf_counter() + duration
+    for frame in itertools.cycle(frames):
+        if time.perf_counter() >= deadline:
+            break
+        sock.sendall(frame)
+    sock.close()
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_mode(mode, producers, duration, batch, warmup):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    import main
+
+    app = QApplication(sys.argv[:1])
+    cluster = main.InstrumentCluster(port=0, verbose=False, ingest_process=mode == "process")
+    cluster.show()
+
+    ticks = []
+    cluster.timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+
+    context = multiprocessing.get_context("spawn")
+    start_event = context.Event()
+    processes = [
+        context.Process(target=produce, args=(cluster.ingest_server.port, warmup + duration, batch, start_event), daemon=True)
+        for _ in range(producers)
+    ]
+    for process in processes:
+        process.start()
+    start_event.set()
+    measure_from = time.perf_counter() + warmup
+    QTimer.singleShot(int((warmup + duration) * 1000), app.quit)
+    app.exec_()
+    for process in processes:
+        process.terminate()
+        process.join()
+    if isinstance(cluster.ingest_server, main.IngestProcess):
+        cluster.ingest_server.stop()
+
+    ticks = [tick for tick in ticks if tick >= measure_from]
+    intervals = sorted((b - a) * 1000 for a, b in zip(ticks, ticks[1:]))
+    expected = 1000 / main.TARGET_FPS
+    mean = sum(intervals) / len(intervals) if intervals else None
+    return {
+        "mode": mode,
+        "frames": len(intervals),
+        "interval_mean_ms": mean,
+        "interval_stdev_ms": (sum((i - mean) ** 2 for i in intervals) / len(intervals)) ** 0.5 if intervals else None,
+        "interval_p50_ms": percentile(intervals, 0.50) if intervals else None,
+        "interval_p99_ms": percentile(intervals, 0.99) if intervals else None,
+        "interval_max_ms": intervals[-1] if intervals else None,
+        "late_frames": sum(1 for interval in intervals if interval > 1.5 * expected),
+        "paint_ms_avg": cluster.paint_stats.summary()["paint_ms_avg"],
+        "paint_ms_max": cluster.paint_stats.summary()["paint_ms_max"],
+        "values_applied": cluster.snapshot.applied,
+    }
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Frame-time jitter with threaded vs worker-process ingestion")
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0, help="measured seconds per mode")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--batch", type=int, default=32, help="updates per frame")
+    parser.add_argument("--output", help="also write the results as JSON")
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        result = run_mode(args.run_mode, args.producers, args.duration, args.batch, args.warmup)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for mode in MODES:
+        command = [sys.executable, os.path.abspath(__file__), "--run-mode", mode, "--producers", str(args.producers),
+                   "--duration", str(args.duration), "--warmup", str(args.warmup), "--batch", str(args.batch)]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{args.producers} producers, {args.batch} updates per frame, {args.duration:.0f} s per mode")
+    print(f"{'mode':<8} {'frames':>7} {'mean ms':>8} {'stdev ms':>9} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'late':>5} {'paint max':>10}")
+    for result in results:
+        if not result["frames"]:
+            print(f"{result['mode']:<8} no frames measured")
+            continue
+        print(f"{result['mode']:<8} {result['frames']:>7} {result['interval_mean_ms']:>8.2f} {result['interval_stdev_ms']:>9.2f} "
+              f"{result['interval_p50_ms']:>7.2f} {result['interval_p99_ms']:>7.2f} {result['interval_max_ms']:>7.2f} "
+              f"{result['late_frames']:>5} {result['paint_ms_max']:>10.2f}")
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QT_VERSION_STR
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+import main
+
+# Headless rendering benchmark: drives InstrumentCluster through scripted value
+# sweeps, paints every frame into a QImage and times paintEvent and each draw_*
+# stage. Results are written as JSON so runs can be compared for regressions.
+
+STAGES = [
+    "draw_background",
+    "draw_road",
+    "draw_speedometer",
+    "draw_rpm_meter",
+    "draw_rpm_small_gauge",
+    "draw_center_speed",
+    "draw_digital_speed",
+]
+
+
+def sweep(frames):
+    # Triangle sweeps across the full range of every gauge, out of phase with each other
+    for frame in range(frames):
+        phase = frame / max(frames - 1, 1)
+        triangle = 1 - abs(2 * phase - 1)
+        speed = triangle * main.MAX_SPEED
+        rpm = (1 - triangle) * main.MAX_RPM
+        fuel_level = (1 - phase) * main.MAX_FUEL
+        yield {
+            "car_status": "ON",
+            "speed": round(speed),
+            "rpm": round(rpm),
+            "fuel_level": round(fuel_level),
+            "needle_speed": speed,
+            "needle_rpm": rpm,
+            "needle_fuel": fuel_level,
+            "icon_status": frame & 0xFF,
+            "dash_offset": (frame * 5) % 20,
+        }
+
+
+def instrument(cluster, samples):
+    # Shadow each draw_* method on the instance with a timing wrapper
+    for name in STAGES:
+        method = getattr(cluster, name)
+        timings = samples.setdefault(name, [])
+
+        def timed(*args, _method=method, _timings=timings, **kwargs):
+            start = time.perf_counter()
+            result = _method(*args, **kwargs)
+            _timings.append(time.perf_counter() - start)
+            return result
+
+        setattr(cluster, name, timed)
+
+
+def percentiles(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": pick(0.50),
+        "p90_ms": pick(0.90),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def run_scenario(cluster, frames, cold):
+    # cold=True drops the cached static layers before every frame to measure a full redraw
+    samples = {}
+    instrument(cluster, samples)
+    image = QImage(cluster.size(), QImage.Format_ARGB32_Premultiplied)
+    paint_times = []
+    atlas = cluster.needle_atlas
+    builds = atlas.builds
+    for state in sweep(frames):
+        for name, value in state.items():
+            setattr(cluster, name, value)
+        if cold:
+            cluster.layer_cache.invalidate()
+        start = time.perf_counter()
+        cluster.render(image)
+        paint_times.append(time.perf_counter() - start)
+    for name in STAGES:
+        delattr(cluster, name)
+
+    total = sum(paint_times)
+    return {
+        "frames": frames,
+        "frames_per_second": frames / total if total else None,
+        "paintEvent": percentiles(paint_times),
+        "stages": {name: percentiles(samples[name]) for name in STAGES},
+        "needle_sprite_builds": atlas.builds - builds,
+    }
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Headless rendering benchmark for InstrumentCluster")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--output", default="bench_render.json", help="machine-readable results file")
+    parser.add_argument("--precise-needles", action="store_true", help="draw needles as vectors instead of from the sprite atlas")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+
+    tracemalloc.start()
+    cluster = main.InstrumentCluster(port=None, verbose=False, precise_needles=args.precise_needles)
+    results = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "platform": app.platformName(),
+        "scenarios": {
+            "cached": run_scenario(cluster, args.frames, cold=False),
+            # The same sweep again, now that every needle sprite it needs is built
+            "warm": run_scenario(cluster, args.frames, cold=False),
+            "cold": run_scenario(cluster, args.frames, cold=True),
+        },
+    }
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    atlas = cluster.needle_atlas
+    results["needle_atlas"] = {
+        "step_degrees": atlas.step,
+        "sprites": len(atlas.sprites),
+        "pieces": sum(len(sprite) for sprite in atlas.sprites.values()),
+        "builds": atlas.builds,
+        "bytes": atlas.bytes,
+    }
+    results["peak_python_memory_bytes"] = peak
+    results["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+
+    for name, scenario in results["scenarios"].items():
+        paint = scenario["paintEvent"]
+        print(f"{name}: {scenario['frames_per_second']:.1f} fps, paintEvent p50 {paint['p50_ms']:.2f} ms, p99 {paint['p99_ms']:.2f} ms, "
+              f"{scenario['needle_sprite_builds']} needle sprites built")
+        for stage, stats in scenario["stages"].items():
+            if stats is not None:
+                print(f"  {stage:<22} p50 {stats['p50_ms']:7.3f} ms  p99 {stats['p99_ms']:7.3f} ms  max {stats['max_ms']:7.3f} ms")
+    needles = results["needle_atlas"]
+    print(f"needle atlas: {needles['sprites']} sprites in {needles['pieces']} pieces, {needles['bytes'] / 1024:.0f} KiB, "
+          f"{needles['builds']} builds")
+    print(f"peak python memory {peak / 1024:.0f} KiB, max RSS {results['max_rss_kb']} KiB")
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
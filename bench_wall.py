@@ -0,0 +1,163 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# CPU and memory of one dashboard wall process as the number of vehicles grows,
+# next to the same vehicles as separate full-size cluster processes (estimated
+# as N times one measured single-vehicle process). Every vehicle is driven by its
+# own connection replaying the drive cycle in real time. Each configuration runs
+# in a fresh interpreter so memory figures don't carry over.
+
+VEHICLE_COUNTS = (1, 2, 4, 8, 16, 32)
+
+
+def produce(port, vehicles, rate, duration, tagged, start_event):
+    from loadgen import drive_cycle
+    from protocol import ADDR_CAR_STATUS, encode_frame
+
+    sockets = [socket.create_connection(("localhost", port)) for _ in range(vehicles)]
+    # Offset each vehicle's drive cycle so they aren't all in lock-step
+    cycles = [itertools.islice(drive_cycle(), 37 * vehicle, None) for vehicle in range(vehicles)]
+    for vehicle, sock in enumerate(sockets):
+        sock.sendall(encode_frame([(ADDR_CAR_STATUS, 1)], vehicle=vehicle if tagged else None))
+    start_event.wait()
+    interval = 1 / rate
+    next_send = time.perf_counter()
+    deadline = next_send + duration
+    while next_send < deadline:
+        for vehicle, (sock, cycle) in enumerate(zip(sockets, cycles)):
+            sock.sendall(encode_frame(next(cycle), vehicle=vehicle if tagged else None))
+        next_send += interval
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    for sock in sockets:
+        sock.close()
+
+
+def rss_kib():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return None
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_config(vehicles, single, scale, rate, duration, warmup):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    import main
+    from dashboard_wall import DashboardWall
+    from ingest import IngestServer
+
+    app = QApplication(sys.argv[:1])
+    server = IngestServer("localhost", 0, verbose=False)
+    if single:
+        # Today's setup: one full-size cluster per process, with its own caches
+        view = main.InstrumentCluster(port=None, verbose=False)
+        view.attach_ingest_server(server)
+        clusters = [view]
+    else:
+        view = DashboardWall(vehicles, scale=scale, ingest_server=server)
+        clusters = view.clusters
+    view.show()
+
+    context = multiprocessing.get_context("spawn")
+    start_event = context.Event()
+    producer = context.Process(target=produce, args=(server.port, vehicles, rate, warmup + duration, not single, start_event),
+                               daemon=True)
+    producer.start()
+    start_event.set()
+
+    measured = {}
+
+    def start_measuring():
+        measured["cpu"] = cpu_seconds()
+        measured["time"] = time.perf_counter()
+        measured["frames"] = sum(cluster.paint_stats.frames for cluster in clusters)
+        measured["paint_time"] = sum(cluster.paint_stats.total_time for cluster in clusters)
+
+    QTimer.singleShot(int(warmup * 1000), start_measuring)
+    QTimer.singleShot(int((warmup + duration) * 1000), app.quit)
+    app.exec_()
+    elapsed = time.perf_counter() - measured["time"]
+    cpu = cpu_seconds() - measured["cpu"]
+    frames = sum(cluster.paint_stats.frames for cluster in clusters) - measured["frames"]
+    paint_time = sum(cluster.paint_stats.total_time for cluster in clusters) - measured["paint_time"]
+    producer.terminate()
+    producer.join()
+
+    return {
+        "vehicles": vehicles,
+        "mode": "single" if single else "wall",
+        "cpu_percent": cpu / elapsed * 100,
+        "rss_mib": rss_kib() / 1024,
+        "max_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "frames_per_second": frames / elapsed,
+        "paint_ms_avg": paint_time / frames * 1000 if frames else None,
+        "updates_applied": sum(cluster.snapshot.applied for cluster in clusters),
+        "layer_builds": clusters[0].layer_cache.builds,
+    }
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="CPU and memory of a dashboard wall from 1 to 32 vehicles")
+    parser.add_argument("--vehicles", type=int, nargs="+", default=list(VEHICLE_COUNTS))
+    parser.add_argument("--scale", type=float, default=0.25, help="size of each view on the wall")
+    parser.add_argument("--rate", type=float, default=10, help="frames per second per vehicle (10 replays the drive cycle in real time)")
+    parser.add_argument("--duration", type=float, default=5.0, help="measured seconds per configuration")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--output", help="also write the results as JSON")
+    parser.add_argument("--run", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run is not None:
+        result = run_config(args.run, args.single, args.scale, args.rate, args.duration, args.warmup)
+        print(json.dumps(result))
+        return
+
+    def run(vehicles, single=False):
+        command = [sys.executable, os.path.abspath(__file__), "--run", str(vehicles), "--scale", str(args.scale),
+                   "--rate", str(args.rate), "--duration", str(args.duration), "--warmup", str(args.warmup)]
+        if single:
+            command.append("--single")
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    single = run(1, single=True)
+    results = [run(vehicles) for vehicles in args.vehicles]
+
+    print(f"{args.rate:g} frames/s per vehicle, views at {args.scale:g}x, {args.duration:.0f} s per configuration")
+    print(f"one full-size cluster process: {single['cpu_percent']:.1f}% CPU, {single['rss_mib']:.0f} MiB RSS")
+    print(f"{'vehicles':>8} {'CPU %':>7} {'RSS MiB':>8} {'MiB/veh':>8} {'frames/s':>9} {'paint ms':>9} "
+          f"{'sep. CPU %':>11} {'sep. MiB':>9}")
+    for result in results:
+        vehicles = result["vehicles"]
+        paint = f"{result['paint_ms_avg']:.2f}" if result["paint_ms_avg"] is not None else "-"
+        print(f"{vehicles:>8} {result['cpu_percent']:>7.1f} {result['rss_mib']:>8.0f} {result['rss_mib'] / vehicles:>8.1f} "
+              f"{result['frames_per_second']:>9.0f} {paint:>9} "
+              f"{single['cpu_percent'] * vehicles:>11.1f} {single['rss_mib'] * vehicles:>9.0f}")
+    print("sep. = estimated for the same vehicles as separate cluster processes (N x one process)")
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"single": single, "wall": results}, output, indent=2)
+
+
+if __name__ == "__main__":
+    main_benchmark()
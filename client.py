@@ -1,13 +1,225 @@
 
 import socket
+import sys
+import time
+from protocol import (ACK_ADDRESS, FLAG_ACK, FLAG_ACK_REQUEST, FLAG_DELTA, FLAG_KEYFRAME, TEMPERATURE_OFFSET, FrameDecoder,
+                      encode_ascii, encode_frame)
+from shm_bank import DEFAULT_NAME as SHM_DEFAULT_NAME, SharedRegisterWriter
  
 def convert_to_hex(address, data):
     # Format address and data to 8-character hexadecimal strings
     address_hex = f"{address:08X}"
     data_hex = f"{data:08X}"
     return address_hex, data_hex
+
+class DeltaEncoder:
+    # Producer-side delta state. Each batch goes out as only the registers whose
+    # value differs from what was last sent (FLAG_DELTA), except that every
+    # keyframe_interval seconds, and after reset(), the full state of every
+    # register seen so far is sent instead (FLAG_KEYFRAME) so a cluster that
+    # restarted or missed something can resynchronize.
+    def __init__(self, keyframe_interval=1.0):
+        self.keyframe_interval = keyframe_interval
+        self.state = {}
+        self.sent = {}
+        self.last_keyframe = None
+        self.keyframes = 0
+        self.suppressed = 0
+
+    def reset(self):
+        # Call after (re)connecting: the other end knows nothing of what was sent before
+        self.sent = {}
+        self.last_keyframe = None
+
+    def encode(self, updates, now=None):
+        # Returns (updates to send, flags); an empty list means nothing changed
+        if now is None:
+            now = time.monotonic()
+        state = self.state
+        for address, value in updates:
+            state[address] = value
+        if self.last_keyframe is None or now - self.last_keyframe >= self.keyframe_interval:
+            self.last_keyframe = now
+            self.keyframes += 1
+            self.sent = dict(state)
+            return list(state.items()), FLAG_KEYFRAME
+        sent = self.sent
+        changed = []
+        for address, value in updates:
+            if sent.get(address) != value:
+                sent[address] = value
+                changed.append((address, value))
+        self.suppressed += len(updates) - len(changed)
+        return changed, FLAG_DELTA
+
+
+class ClusterClient:
+    # Reusable producer connection to the cluster. Batches of updates go out as
+    # one binary frame (or back-to-back ASCII messages), and a dropped connection
+    # is re-established with exponential backoff before the batch is resent.
+    def __init__(self, host="localhost", port=8080, binary=True, request_acks=False, trace=False,
+                 initial_backoff=0.1, max_backoff=5.0, max_retries=None, delta=False, keyframe_interval=1.0, vehicle=None):
+        self.host = host
+        self.port = port
+        self.binary = binary
+        self.request_acks = request_acks and binary
+        # Traced frames carry a sequence number and send time for latency measurement
+        self.trace = trace and binary
+        self.seq = 0
+        # Delta mode sends only changed registers, with periodic keyframes
+        self.delta = DeltaEncoder(keyframe_interval) if delta and binary else None
+        # Frames name their vehicle when the cluster process hosts several (binary only)
+        self.vehicle = vehicle if binary else None
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self.sock = None
+        self.decoder = FrameDecoder()
+        self.updates_sent = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.acked = 0
+        self.reconnects = 0
+
+    def connect(self, retries=None):
+        # retries=0 makes a single attempt and raises if the cluster isn't there
+        retries = self.max_retries if retries is None else retries
+        backoff = self.initial_backoff
+        attempt = 0
+        while True:
+            try:
+                self.sock = socket.create_connection((self.host, self.port))
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.decoder = FrameDecoder()
+                if self.delta is not None:
+                    self.delta.reset()
+                return
+            except OSError:
+                if retries is not None and attempt >= retries:
+                    raise
+            attempt += 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def encode(self, updates):
+        # Returns the bytes to send and how many updates they carry
+        if self.binary:
+            flags = FLAG_ACK_REQUEST if self.request_acks else 0
+            if self.delta is not None:
+                updates, delta_flags = self.delta.encode(updates)
+                if not updates:
+                    return b"", 0
+                flags |= delta_flags
+            if self.trace:
+                self.seq += 1
+                return encode_frame(updates, flags, self.seq, time.time_ns(), self.vehicle), len(updates)
+            return encode_frame(updates, flags, vehicle=self.vehicle), len(updates)
+        return b"".join(encode_ascii(address, data) for address, data in updates), len(updates)
+
+    def send_updates(self, updates):
+        updates = list(updates)
+        while True:
+            if self.sock is None:
+                self.connect()
+            # Encoded per attempt: reconnecting resets the delta state, so a resend becomes a keyframe
+            data, count = self.encode(updates)
+            if not data:
+                return
+            try:
+                self.sock.sendall(data)
+                break
+            except OSError:
+                self.close()
+                self.reconnects += 1
+        self.updates_sent += count
+        self.frames_sent += 1
+        self.bytes_sent += len(data)
+
+    def send(self, address, data):
+        self.send_updates([(address, data)])
+
+    def poll_acks(self, timeout=0.0):
+        # Reads any acknowledgements the server has sent; returns how many updates they cover
+        if self.sock is None:
+            return 0
+        acked = 0
+        self.sock.settimeout(timeout)
+        try:
+            data = self.sock.recv(65536)
+        except (BlockingIOError, socket.timeout):
+            data = None
+        except OSError:
+            data = None
+        finally:
+            if self.sock is not None:
+                self.sock.settimeout(None)
+        if data:
+            for frame in self.decoder.feed(data):
+                if frame.flags & FLAG_ACK:
+                    acked += sum(value for address, value in frame.updates if address == ACK_ADDRESS)
+        self.acked += acked
+        return acked
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+class SharedMemoryClient:
+    # Same interface as ClusterClient for a producer on the cluster's host: updates
+    # are stored straight into the cluster's shared register bank (main.py --shm),
+    # with no socket, encoding or acknowledgement round trip
+    def __init__(self, name=SHM_DEFAULT_NAME, initial_backoff=0.1, max_backoff=5.0, max_retries=None):
+        self.name = name
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        self.writer = None
+        self.updates_sent = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.acked = 0
+        self.reconnects = 0
+
+    def connect(self, retries=None):
+        # Waits for the cluster to create the block, like ClusterClient waits for the listener
+        retries = self.max_retries if retries is None else retries
+        backoff = self.initial_backoff
+        attempt = 0
+        while True:
+            try:
+                self.writer = SharedRegisterWriter(self.name)
+                return
+            except FileNotFoundError:
+                if retries is not None and attempt >= retries:
+                    raise
+            attempt += 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def send_updates(self, updates):
+        if self.writer is None:
+            self.connect()
+        self.updates_sent += self.writer.write_many(updates)
+        self.frames_sent += 1
+
+    def send(self, address, data):
+        self.send_updates([(address, data)])
+
+    def poll_acks(self, timeout=0.0):
+        return 0
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+def send_message(client, address, data):
+    address_hex, data_hex = convert_to_hex(address, data)
+    print(f"Address Code: {address_hex}, Data Code: {data_hex}")
+    client.send(address, data)
  
-def update_icon_status(client_socket):
+def update_icon_status(client):
     icon_status = 0b00000000  # Initialize all icons to OFF (0)
  
     # Function to update a specific icon's status and print address and data
@@ -57,18 +269,22 @@ def update_icon_status(client_socket):
            
             # Print the combined message before sending
             print(f"Sending icon status: {combined_message}")
-            client_socket.sendall(combined_message.encode())
+            send_message(client, address, icon_status)
            
         except (KeyboardInterrupt, EOFError):
             print("\nExiting icon status update.")
             break
  
-def start_client():
-    # Set up socket client
-    client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+def start_client(binary=False, trace=False, shm=None, delta=False):
+    # Set up socket client, or write into the cluster's shared memory when it runs on this host.
+    # Delta mode (binary only) skips registers whose value hasn't changed since they were last sent.
+    if shm:
+        client = SharedMemoryClient(shm)
+    else:
+        client = ClusterClient('localhost', 8080, binary=binary or delta, trace=trace, delta=delta)
     try:
-        client_socket.connect(('localhost', 8080))
-    except ConnectionRefusedError:
+        client.connect(retries=0)
+    except (ConnectionRefusedError, FileNotFoundError):
         print("Unable to connect to the server. Make sure the server is running.")
         return
  
@@ -81,11 +297,8 @@ def start_client():
            
             address = 0x00  # Address for car status
             data = 0x01 if car_status == 'on' else 0x00  # 0x01 for ON, 0x00 for OFF
-            address_hex, data_hex = convert_to_hex(address, data)
-            combined_message = f"{address_hex} {data_hex}"
-            print(f"Sending: {combined_message}")
-            print(f"Address Code: {address_hex}, Data Code: {data_hex}")
-            client_socket.sendall(combined_message.encode())
+            print(f"Sending: {address:08X} {data:08X}")
+            send_message(client, address, data)
  
             # Get additional inputs when the car is ON
             if car_status == 'on':
@@ -94,11 +307,8 @@ def start_client():
                 if speed_input.isdigit() and 0 <= int(speed_input) <= 220:
                     address = 0x01  # Address for speed
                     data = int(speed_input)  # Speed as data
-                    address_hex, data_hex = convert_to_hex(address, data)
-                    combined_message = f"{address_hex} {data_hex}"
-                    print(f"Sending: {combined_message}")
-                    print(f"Address Code: {address_hex}, Data Code: {data_hex}")
-                    client_socket.sendall(combined_message.encode())
+                    print(f"Sending: {address:08X} {data:08X}")
+                    send_message(client, address, data)
                 else:
                     print("Invalid speed. Please enter a number between 0 and 220.")
                     continue  # Skip RPM and Fuel input if speed is invalid
@@ -108,11 +318,8 @@ def start_client():
                 if rpm_input.isdigit() and 0 <= int(rpm_input) <= 8000:
                     address = 0x02  # Address for RPM
                     data = int(rpm_input)  # RPM as data
-                    address_hex, data_hex = convert_to_hex(address, data)
-                    combined_message = f"{address_hex} {data_hex}"
-                    print(f"Sending: {combined_message}")
-                    print(f"Address Code: {address_hex}, Data Code: {data_hex}")
-                    client_socket.sendall(combined_message.encode())
+                    print(f"Sending: {address:08X} {data:08X}")
+                    send_message(client, address, data)
                 else:
                     print("Invalid RPM. Please enter a number between 0 and 8000.")
                     continue  # Skip Fuel input if RPM is invalid
@@ -122,25 +329,33 @@ def start_client():
                 if fuel_input.isdigit() and 0 <= int(fuel_input) <= 100:
                     address = 0x03  # Address for Fuel Level
                     data = int(fuel_input)  # Fuel level as data
-                    address_hex, data_hex = convert_to_hex(address, data)
-                    combined_message = f"{address_hex} {data_hex}"
-                    print(f"Sending: {combined_message}")
-                    print(f"Address Code: {address_hex}, Data Code: {data_hex}")
-                    client_socket.sendall(combined_message.encode())
+                    print(f"Sending: {address:08X} {data:08X}")
+                    send_message(client, address, data)
                 else:
                     print("Invalid Fuel Level. Please enter a number between 0 and 100.")
+ 
+                # Get temperature input; it travels offset so sub-zero values fit the register
+                temperature_input = input("Enter temperature in °C (-40-85): ").strip()
+                if temperature_input.lstrip("-").isdigit() and -40 <= int(temperature_input) <= 85:
+                    address = 0x05  # Address for temperature
+                    data = int(temperature_input) + TEMPERATURE_OFFSET
+                    print(f"Sending: {address:08X} {data:08X}")
+                    send_message(client, address, data)
+                else:
+                    print("Invalid temperature. Please enter a number between -40 and 85.")
            
             # Call the function to update icon status
-            update_icon_status(client_socket)
+            update_icon_status(client)
            
         except (KeyboardInterrupt, EOFError):
             print("\nClient shutting down.")
             break
  
     # Close socket
-    client_socket.close()
+    client.close()
  
 if __name__ == "__main__":
-    start_client()
+    shm = SHM_DEFAULT_NAME if "--shm" in sys.argv[1:] else None
+    start_client(binary="--binary" in sys.argv[1:], trace="--trace" in sys.argv[1:], shm=shm, delta="--delta" in sys.argv[1:])
  
  
\ No newline at end of file
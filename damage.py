@@ -0,0 +1,73 @@
+import threading
+import time
+
+from PyQt5.QtCore import QRectF
+
+
+class DamageTracker:
+    # Tracks the bounding rect of each gauge together with a key function that
+    # captures everything the gauge displays. refresh() diffs the keys against
+    # the last refresh and repaints only the rects whose key changed. Rects are
+    # given at the logical size and kept in widget pixels for a scaled widget.
+    def __init__(self, widget, scale=1.0):
+        self.widget = widget
+        self.scale = scale
+        self.regions = {}
+        self.pending = False  # A repaint has been requested but not painted yet
+        self.repainted_pixels = 0
+        self.pixels_per_second = 0.0
+        self._window_start = time.monotonic()
+        self._window_pixels = 0
+        self._window_lock = threading.Lock()  # The stats thread reads the rate
+
+    def track(self, name, rect, key):
+        if self.scale != 1.0:
+            scale = self.scale
+            rect = QRectF(rect.x() * scale, rect.y() * scale, rect.width() * scale, rect.height() * scale).toAlignedRect()
+        self.regions[name] = [rect, key, key()]
+
+    def rect(self, name):
+        return self.regions[name][0]
+
+    def intersects(self, region, *names):
+        return any(region.intersects(self.regions[name][0]) for name in names)
+
+    def refresh(self):
+        # Returns whether any region was scheduled for repaint
+        damaged = False
+        for region in self.regions.values():
+            rect, key, last = region
+            current = key()
+            if current != last:
+                region[2] = current
+                self.widget.update(rect)
+                damaged = True
+        self.pending = self.pending or damaged
+        return damaged
+
+    def invalidate_all(self):
+        for region in self.regions.values():
+            region[2] = region[1]()
+        self.widget.update()
+        self.pending = True
+
+    def record_paint(self, region):
+        # Called from paintEvent with the region Qt asked us to repaint
+        self.pending = False
+        pixels = sum(rect.width() * rect.height() for rect in region.rects())
+        with self._window_lock:
+            self.repainted_pixels += pixels
+            self._window_pixels += pixels
+        self.pixel_rate()
+
+    def pixel_rate(self):
+        # Repainted pixels per second over the last complete window of at least one
+        # second. Also rolled on read, so the rate drops to 0 once painting stops.
+        with self._window_lock:
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            if elapsed >= 1.0:
+                self.pixels_per_second = self._window_pixels / elapsed
+                self._window_start = now
+                self._window_pixels = 0
+            return self.pixels_per_second
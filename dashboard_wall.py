@@ -0,0 +1,116 @@
+import argparse
+import math
+import sys
+import threading
+
+from PyQt5.QtWidgets import QApplication, QGridLayout, QWidget
+
+from ingest import IngestServer
+from main import TARGET_FPS, ClusterResources, InstrumentCluster
+from metrics import StatsServer
+
+# One process showing a grid of cluster views, one per simulated vehicle, for
+# test benches that used to run a cluster process per vehicle. A single listener
+# takes frames for every vehicle: frames tagged with a vehicle ID (FLAG_VEHICLE)
+# go to that vehicle's view and untagged frames to vehicle 0. The views share
+# one set of render caches, fonts and decoded images.
+
+
+class DashboardWall(QWidget):
+    def __init__(self, vehicles, columns=None, scale=0.25, ingest_server=None, verbose=False, target_fps=TARGET_FPS):
+        super().__init__()
+        self.setWindowTitle(f"Instrument Cluster Wall ({vehicles} vehicles)")
+        # Views are 3:1, so this many columns keeps the wall roughly square
+        columns = columns or max(1, math.ceil(math.sqrt(vehicles / 3)))
+        layout = QGridLayout(self)
+        layout.setSpacing(4)
+        layout.setContentsMargins(4, 4, 4, 4)
+        self.resources = ClusterResources()
+        self.clusters = []
+        for vehicle in range(vehicles):
+            cluster = InstrumentCluster(port=None, verbose=verbose, target_fps=target_fps, scale=scale, resources=self.resources)
+            layout.addWidget(cluster, vehicle // columns, vehicle % columns)
+            self.clusters.append(cluster)
+        self.unknown_vehicle = 0
+        self.ingest_server = None
+        if ingest_server is not None:
+            self.attach_ingest_server(ingest_server)
+
+    def attach_ingest_server(self, server):
+        self.ingest_server = server
+        server.on_frames = self.route_frames
+        server.on_invalid = self.clusters[0].report_invalid
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def route_frames(self, connection, frames):
+        # Runs on the ingestion thread; each vehicle's frames keep their arrival order
+        batches = {}
+        for frame in frames:
+            vehicle = frame.vehicle or 0
+            batch = batches.get(vehicle)
+            if batch is None:
+                batches[vehicle] = [frame]
+            else:
+                batch.append(frame)
+        clusters = self.clusters
+        for vehicle, batch in batches.items():
+            if vehicle < len(clusters):
+                clusters[vehicle].ingest_frames(connection, batch)
+            else:
+                self.unknown_vehicle += len(batch)
+
+    def collect_metrics(self):
+        # Called on the stats server's thread; only reads counters
+        resources = self.resources
+        vehicles = {}
+        for vehicle, cluster in enumerate(self.clusters):
+            vehicles[str(vehicle)] = {
+                "updates_total": sum(cluster.messages.counts.copy().values()),
+                "frames_rendered": cluster.paint_stats.frames,
+                "dropped_frames": cluster.animation.dropped_frames,
+            }
+        return {
+            "vehicles": len(self.clusters),
+            "unknown_vehicle_frames": self.unknown_vehicle,
+            "ingest": self.ingest_server.stats() if self.ingest_server is not None else {},
+            "shared": {
+                "layer_builds": resources.layer_cache.builds,
+                "needle_sprites": len(resources.needle_atlas.sprites),
+                "needle_sprite_bytes": resources.needle_atlas.bytes,
+                "fonts": len(resources.text_cache.fonts),
+                "images": len(resources.images),
+            },
+            "vehicle": vehicles,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Several instrument clusters in one window, one per vehicle")
+    parser.add_argument("--vehicles", type=int, default=4)
+    parser.add_argument("--columns", type=int, help="views per row (default: keep the wall roughly square)")
+    parser.add_argument("--scale", type=float, default=0.25, help="size of each view relative to a full cluster")
+    parser.add_argument("--port", type=int, default=8080, help="port the shared ingestion server listens on")
+    parser.add_argument("--fps", type=int, default=TARGET_FPS, help="target animation frame rate")
+    parser.add_argument("--stats-port", type=int, metavar="PORT", help="serve live metrics on http://localhost:PORT/metrics")
+    parser.add_argument("--verbose", action="store_true", help="print every register change")
+    args, qt_args = parser.parse_known_args()
+    if args.vehicles < 1:
+        parser.error("--vehicles must be at least 1")
+
+    # Bound before the GUI is built, as in main.py
+    server = IngestServer("localhost", args.port, verbose=args.verbose)
+    app = QApplication(sys.argv[:1] + qt_args)
+    wall = DashboardWall(args.vehicles, args.columns, args.scale, verbose=args.verbose, target_fps=args.fps)
+    wall.show()
+    wall.attach_ingest_server(server)
+    print(f"Showing {args.vehicles} vehicles; send frames tagged with vehicle IDs 0-{args.vehicles - 1} to port {server.port}")
+
+    if args.stats_port is not None:
+        stats_server = StatsServer(wall.collect_metrics, port=args.stats_port)
+        stats_server.start()
+        print(f"Metrics available at http://localhost:{stats_server.port}/metrics")
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+import multiprocessing
+import selectors
+import socket
+import threading
+import time
+
+from protocol import FLAG_ACK_REQUEST, FLAG_DELTA, FLAG_KEYFRAME, FrameDecoder, encode_ack
+from registers import Register, RegisterBank
+
+RECV_SIZE = 65536
+KEYFRAME_TIMEOUT = 3.0  # Seconds a delta-mode producer may go without a keyframe
+FLUSH_INTERVAL = 0.002  # Seconds a worker process coalesces validated values before sending them
+STATS_INTERVAL = 0.5
+
+
+class Connection:
+    # Per-producer state: each producer gets its own decoder so partial frames
+    # from different sockets never mix
+    __slots__ = ("sock", "address", "decoder", "frames_received", "bytes_received", "unacked", "outgoing",
+                 "last_seq", "recv_ns", "decode_ns", "synced", "last_keyframe", "keyframe_overdue")
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.decoder = FrameDecoder()
+        self.frames_received = 0
+        self.bytes_received = 0
+        self.unacked = 0
+        self.outgoing = bytearray()
+        # Latency tracing: last traced sequence number and timestamps of the latest read
+        self.last_seq = None
+        self.recv_ns = 0
+        self.decode_ns = 0
+        # Delta mode: whether a keyframe has been seen, and when the latest arrived
+        self.synced = False
+        self.last_keyframe = 0.0
+        self.keyframe_overdue = False
+
+
+class IngestServer:
+    # Event-driven ingestion server. Accepts any number of producers and
+    # multiplexes them on a single thread with selectors; decoded frames are
+    # handed to on_frames(connection, frames) in arrival order.
+    def __init__(self, host="localhost", port=8080, on_frames=None, on_invalid=None, backlog=16, verbose=True,
+                 keyframe_timeout=KEYFRAME_TIMEOUT):
+        self.on_frames = on_frames
+        self.on_invalid = on_invalid
+        self.verbose = verbose
+        self.keyframe_timeout = keyframe_timeout
+        self.connections = {}
+        self.connections_accepted = 0
+        self.disconnects = 0
+        self.decode_errors = 0
+        self.callback_errors = 0
+        self.accept_errors = 0
+        self.keyframes = 0
+        self.deltas = 0
+        self.unsynced_deltas = 0
+        self.missed_keyframes = 0
+        self.running = False
+
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((host, port))
+        self.server_socket.listen(backlog)
+        self.server_socket.setblocking(False)
+        self.address = self.server_socket.getsockname()
+
+        # Writing to the wake socket interrupts select() so stop() takes effect immediately
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server_socket, selectors.EVENT_READ)
+        self.selector.register(self._wake_reader, selectors.EVENT_READ)
+
+    @property
+    def port(self):
+        return self.address[1]
+
+    def stats(self):
+        return {
+            "connections": len(self.connections),
+            "connections_accepted": self.connections_accepted,
+            "disconnects": self.disconnects,
+            "decode_errors": self.decode_errors,
+            "callback_errors": self.callback_errors,
+            "accept_errors": self.accept_errors,
+            "keyframes": self.keyframes,
+            "deltas": self.deltas,
+            "unsynced_deltas": self.unsynced_deltas,
+            "missed_keyframes": self.missed_keyframes,
+        }
+
+    def serve_forever(self):
+        self.running = True
+        if self.verbose:
+            print(f"Server is listening on port {self.port}...")
+        try:
+            while self.running:
+                for key, _ in self.selector.select():
+                    if key.fileobj is self.server_socket:
+                        self._accept()
+                    elif key.fileobj is self._wake_reader:
+                        self._wake_reader.recv(64)
+                    else:
+                        self._read(key.data)
+        finally:
+            self._close_all()
+
+    def stop(self):
+        self.running = False
+        try:
+            self._wake_writer.send(b"\0")
+        except OSError:
+            pass
+
+    def _accept(self):
+        # Drain the whole accept backlog in one wakeup
+        while True:
+            try:
+                sock, address = self.server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as error:
+                # e.g. EMFILE with too many producers, or ECONNABORTED; the
+                # listener and existing connections are unaffected
+                self.accept_errors += 1
+                if self.accept_errors == 1 or self.verbose:
+                    print(f"Failed to accept a connection: {error}")
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection = Connection(sock, address)
+            self.connections[sock] = connection
+            self.connections_accepted += 1
+            self.selector.register(sock, selectors.EVENT_READ, connection)
+            if self.verbose:
+                print(f"Client connected: {address}")
+
+    def _read(self, connection):
+        try:
+            data = connection.sock.recv(RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._disconnect(connection)
+            return
+
+        connection.recv_ns = time.time_ns()
+        connection.bytes_received += len(data)
+        decoder = connection.decoder
+        errors = decoder.errors
+        frames = decoder.feed(data)
+        connection.decode_ns = time.time_ns()
+        if decoder.errors != errors:
+            self.decode_errors += decoder.errors - errors
+            if self.on_invalid is not None and not self._deliver(connection, self.on_invalid, data):
+                return
+        if frames:
+            connection.frames_received += len(frames)
+            if self.on_frames is not None and not self._deliver(connection, self.on_frames, frames):
+                return
+            for frame in frames:
+                if frame.flags & (FLAG_KEYFRAME | FLAG_DELTA):
+                    self._track_sync(connection, frame.flags)
+                if frame.flags & FLAG_ACK_REQUEST:
+                    connection.unacked += len(frame.updates)
+            if connection.unacked or connection.outgoing:
+                self._send_ack(connection)
+
+    def _deliver(self, connection, callback, payload):
+        # A callback that raises costs only this producer its connection; the
+        # loop keeps serving everyone else
+        try:
+            callback(connection, payload)
+        except Exception as error:
+            self.callback_errors += 1
+            print(f"Error handling data from {connection.address}, dropping the connection: {error!r}")
+            self._disconnect(connection)
+            return False
+        return True
+
+    def _track_sync(self, connection, flags):
+        # Deltas are applied either way, but registers the producer hasn't resent
+        # since it lost sync (or since we restarted) may be stale until a keyframe
+        if flags & FLAG_KEYFRAME:
+            self.keyframes += 1
+            connection.synced = True
+            connection.last_keyframe = time.monotonic()
+            connection.keyframe_overdue = False
+            return
+        self.deltas += 1
+        if not connection.synced:
+            self.unsynced_deltas += 1
+        if connection.keyframe_overdue:
+            return
+        # Reported once per gap: deltas before any keyframe, or none within keyframe_timeout
+        if not connection.synced or time.monotonic() - connection.last_keyframe > self.keyframe_timeout:
+            connection.keyframe_overdue = True
+            self.missed_keyframes += 1
+            if self.verbose:
+                print(f"Missed keyframe from {connection.address}")
+
+    def _send_ack(self, connection):
+        # Acknowledge everything handed off so far in one frame. While an earlier
+        # ack is still stuck in a full socket buffer, new counts accumulate instead.
+        if not connection.outgoing:
+            connection.outgoing += encode_ack(connection.unacked)
+            connection.unacked = 0
+        try:
+            sent = connection.sock.send(connection.outgoing)
+        except OSError:
+            return
+        del connection.outgoing[:sent]
+
+    def _disconnect(self, connection):
+        self.selector.unregister(connection.sock)
+        del self.connections[connection.sock]
+        connection.sock.close()
+        self.disconnects += 1
+        if self.verbose:
+            print(f"Client disconnected: {connection.address}")
+
+    def _close_all(self):
+        for connection in list(self.connections.values()):
+            self._disconnect(connection)
+        self.selector.close()
+        self.server_socket.close()
+        self._wake_reader.close()
+        self._wake_writer.close()
+
+
+class IngestProcess:
+    # Runs IngestServer together with the register range checks in a child
+    # process, so accepting, framing, decoding and validating never compete with
+    # the GUI thread for the GIL. The child sends batches of validated
+    # (address, raw value) pairs over a pipe, coalesced per address for up to
+    # flush_interval, along with the trace records of traced frames. The parent
+    # watches fileno() for readability and calls receive(). The child binds in
+    # the background: port is set once it listens, and wait_ready() blocks for it.
+    # Once the worker fails or exits, alive is False and error says why.
+    def __init__(self, registers, host="localhost", port=8080, flush_interval=FLUSH_INTERVAL, verbose=True):
+        # Only the ranges travel to the child; decoding to display values stays in the GUI process
+        specs = [(register.address, register.name, register.label, register.minimum, register.maximum) for register in registers]
+        # spawn rather than fork: forking a process that has started Qt's threads isn't safe
+        context = multiprocessing.get_context("spawn")
+        self.receiver, sender = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=run_ingest_worker, args=(sender, specs, host, port, flush_interval, verbose), daemon=True)
+        self.process.start()
+        sender.close()
+        self.port = None
+        self.alive = True
+        self.error = None
+        self.latest_stats = {}
+
+    def wait_ready(self, timeout=10):
+        if self.error is not None:
+            raise OSError(self.error)
+        if self.port is not None:
+            return
+        if not self.receiver.poll(timeout):
+            self.process.terminate()
+            raise RuntimeError("Ingestion worker process did not start")
+        kind, payload = self.receiver.recv()
+        if kind == "error":
+            self.alive = False
+            self.error = payload
+            self.process.join()
+            raise OSError(payload)
+        self.port = payload
+
+    def fileno(self):
+        return self.receiver.fileno()
+
+    def receive(self):
+        # Drains everything the worker has sent; returns (updates, traces)
+        updates = []
+        traces = []
+        try:
+            while self.receiver.poll():
+                kind, payload = self.receiver.recv()
+                if kind == "batch":
+                    updates.extend(payload[0])
+                    traces.extend(payload[1])
+                elif kind == "stats":
+                    self.latest_stats = payload
+                elif kind == "ready":
+                    self.port = payload
+                elif kind == "error":
+                    self.alive = False
+                    self.error = payload
+        except (EOFError, OSError):
+            # The worker has exited; fileno() stays readable from now on
+            self.alive = False
+            if self.error is None:
+                self.error = "ingestion worker process exited"
+        return updates, traces
+
+    def stats(self):
+        stats = dict(self.latest_stats)
+        stats["worker_alive"] = self.alive
+        if self.error is not None:
+            stats["worker_error"] = self.error
+        return stats
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.receiver.close()
+
+
+def run_ingest_worker(sender, specs, host, port, flush_interval, verbose):
+    # Entry point of the IngestProcess child
+    bank = RegisterBank([Register(*spec) for spec in specs])
+    bank.on_reject = lambda register, data: print(f"Invalid {register.label} received: {data}")
+    lock = threading.Lock()
+    pending = {}
+    traces = []
+
+    def on_frames(connection, frames):
+        write = bank.write
+        with lock:
+            for frame in frames:
+                if frame.seq is not None:
+                    traces.append((connection.last_seq, frame.seq, frame.sent_ns, connection.recv_ns, connection.decode_ns,
+                                   [address for address, _ in frame.updates]))
+                    connection.last_seq = frame.seq
+                for address, value in frame.updates:
+                    # Every accepted value is forwarded, not just changes: the GUI's
+                    # own bank may have diverged (switching the car off zeroes speed).
+                    # Re-inserting keeps the batch in last-write order, so car on,
+                    # speed, car off still arrives with the car going off last.
+                    if write(address, value):
+                        pending.pop(address, None)
+                        pending[address] = value
+
+    def on_invalid(connection, data):
+        print("Invalid data received from client:", data)
+
+    try:
+        server = IngestServer(host, port, on_frames=on_frames, on_invalid=on_invalid, verbose=verbose)
+    except OSError as error:
+        sender.send(("error", str(error)))
+        return
+    sender.send(("ready", server.port))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    next_stats = time.monotonic()
+    try:
+        while True:
+            time.sleep(flush_interval)
+            with lock:
+                if pending or traces:
+                    batch = (list(pending.items()), traces[:])
+                    pending.clear()
+                    traces.clear()
+                else:
+                    batch = None
+            if batch is not None:
+                sender.send(("batch", batch))
+            if time.monotonic() >= next_stats:
+                next_stats += STATS_INTERVAL
+                stats = server.stats()
+                stats["rejected"] = bank.rejected
+                stats["unknown_address"] = bank.unknown
+                sender.send(("stats", stats))
+    except (BrokenPipeError, EOFError, OSError):
+        # The GUI process went away
+        server.stop()
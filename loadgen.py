@@ -0,0 +1,171 @@
+import argparse
+import csv
+import itertools
+import math
+import threading
+import time
+
+from client import ClusterClient, SharedMemoryClient
+from protocol import ADDR_CAR_STATUS, ADDR_FUEL, ADDR_ICONS, ADDR_RPM, ADDR_SPEED, ADDR_TEMPERATURE, REGISTER_ADDRESSES, TEMPERATURE_OFFSET
+from shm_bank import DEFAULT_NAME as SHM_DEFAULT_NAME
+
+# Load generator for sizing the cluster's ingestion capacity: replays a synthetic
+# drive cycle or a CSV trace over N concurrent connections at a target message
+# rate and reports the achieved send rate and the server's acknowledged rate.
+
+
+def drive_cycle(step=0.1):
+    # Synthetic urban/highway cycle sampled every `step` seconds, looping forever:
+    # pull away, cruise, overtake, brake to a stop, idle
+    segments = [(8, 0, 50), (10, 50, 50), (6, 50, 110), (12, 110, 110), (4, 110, 140), (10, 140, 0), (5, 0, 0)]
+    fuel = 100.0
+    temperature = 21  # Outside temperature, drifting slowly
+    while True:
+        for duration, start_speed, end_speed in segments:
+            samples = int(duration / step)
+            for i in range(samples):
+                speed = start_speed + (end_speed - start_speed) * i / samples
+                accelerating = end_speed > start_speed
+                gear_ratio = 35 if speed < 60 else 25
+                rpm = min(8000, 800 + speed * gear_ratio + (1200 if accelerating else 0))
+                fuel = fuel - 0.002 * (1 + speed / 50) if fuel > 5 else 100.0
+                indicators = 0b01 if accelerating and speed > 100 and math.sin(i) > 0 else 0
+                icons = indicators | (0b100 if speed > 0 else 0) | (0b1000000 if speed > 0 else 0)
+                yield [
+                    (ADDR_SPEED, int(speed)),
+                    (ADDR_RPM, int(rpm)),
+                    (ADDR_FUEL, int(fuel)),
+                    (ADDR_ICONS, icons),
+                    (ADDR_TEMPERATURE, int(temperature + 2 * math.sin(fuel / 10)) + TEMPERATURE_OFFSET),
+                ]
+
+
+def csv_trace(path):
+    # Each row is one state sample; columns named after registers
+    # (car_status, speed, rpm, fuel_level, icon_status, temperature in Celsius) become updates
+    with open(path, newline="") as trace:
+        rows = []
+        for row in csv.DictReader(trace):
+            updates = []
+            for name, value in row.items():
+                if name in REGISTER_ADDRESSES and value not in ("", None):
+                    raw = int(float(value))
+                    if name == "temperature":
+                        raw += TEMPERATURE_OFFSET
+                    updates.append((REGISTER_ADDRESSES[name], raw))
+            if updates:
+                rows.append(updates)
+    if not rows:
+        raise ValueError(f"{path} contains no register columns")
+    return itertools.cycle(rows)
+
+
+def update_stream(source):
+    # Flatten state samples into one endless stream of (address, value) updates
+    for updates in source:
+        yield from updates
+
+
+class Producer(threading.Thread):
+    def __init__(self, args, rate, source, vehicle=None):
+        super().__init__(daemon=True)
+        if args.shm:
+            self.client = SharedMemoryClient(args.shm)
+        else:
+            self.client = ClusterClient(args.host, args.port, binary=not args.ascii, request_acks=not args.ascii, trace=args.trace,
+                                        delta=args.delta, keyframe_interval=args.keyframe_interval, vehicle=vehicle)
+        self.rate = rate
+        self.batch = args.batch
+        self.duration = args.duration
+        self.updates = update_stream(source)
+        self.error = None
+
+    def run(self):
+        try:
+            self.client.connect(retries=5)
+            self.client.send(ADDR_CAR_STATUS, 1)
+            interval = self.batch / self.rate if self.rate else 0
+            start = time.perf_counter()
+            deadline = start + self.duration
+            next_send = start
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if interval and now < next_send:
+                    time.sleep(next_send - now)
+                self.client.send_updates(itertools.islice(self.updates, self.batch))
+                next_send += interval
+                self.client.poll_acks()
+        except OSError as error:
+            self.error = error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the instrument cluster with synthetic or recorded load")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--connections", type=int, default=1, help="number of concurrent producer connections")
+    parser.add_argument("--rate", type=float, default=1000, help="total updates per second across all connections, 0 for unthrottled")
+    parser.add_argument("--batch", type=int, default=4, help="updates per frame")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to send for")
+    parser.add_argument("--csv", metavar="PATH", help="replay a CSV trace instead of the synthetic drive cycle")
+    parser.add_argument("--ascii", action="store_true", help="use the legacy ASCII protocol (no acknowledgements)")
+    parser.add_argument("--trace", action="store_true", help="stamp frames for end-to-end latency tracing")
+    parser.add_argument("--delta", action="store_true", help="send only changed registers, with periodic keyframes")
+    parser.add_argument("--keyframe-interval", type=float, default=1.0, help="seconds between full-state keyframes in delta mode")
+    parser.add_argument("--shm", nargs="?", const=SHM_DEFAULT_NAME, metavar="NAME",
+                        help="write into the cluster's shared register bank instead of a socket")
+    parser.add_argument("--vehicles", type=int, default=0,
+                        help="tag frames with vehicle IDs 0..N-1, assigned to connections in turn, for dashboard_wall.py")
+    args = parser.parse_args()
+    if args.shm and args.connections != 1:
+        parser.error("a shared register bank takes a single writer; use --connections 1 with --shm")
+    if args.vehicles and (args.ascii or args.shm):
+        parser.error("vehicle IDs need the binary socket protocol")
+    acknowledged = not args.ascii and not args.shm
+
+    per_connection = args.rate / args.connections
+    producers = [
+        Producer(args, per_connection, csv_trace(args.csv) if args.csv else drive_cycle(), i % args.vehicles if args.vehicles else None)
+        for i in range(args.connections)
+    ]
+    start = time.perf_counter()
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    send_elapsed = time.perf_counter() - start
+
+    # Give the server a moment to acknowledge whatever is still in flight
+    sent = sum(producer.client.updates_sent for producer in producers)
+    drain_deadline = time.perf_counter() + 1.0
+    while acknowledged and time.perf_counter() < drain_deadline:
+        if sum(producer.client.acked for producer in producers) >= sent:
+            break
+        for producer in producers:
+            producer.client.poll_acks(timeout=0.05)
+    ack_elapsed = time.perf_counter() - start
+
+    acked = sum(producer.client.acked for producer in producers)
+    frames = sum(producer.client.frames_sent for producer in producers)
+    reconnects = sum(producer.client.reconnects for producer in producers)
+    sent_bytes = sum(getattr(producer.client, "bytes_sent", 0) for producer in producers)
+    suppressed = sum(producer.client.delta.suppressed for producer in producers if getattr(producer.client, "delta", None))
+    for producer in producers:
+        producer.client.close()
+        if producer.error is not None:
+            print(f"Producer failed: {producer.error}")
+
+    print(f"connections        {args.connections}")
+    print(f"updates sent       {sent} in {send_elapsed:.2f} s ({sent / send_elapsed:.0f} updates/s, {frames / send_elapsed:.0f} frames/s)")
+    print(f"bytes sent         {sent_bytes} ({sent_bytes / send_elapsed / 1024:.1f} KiB/s)")
+    if args.delta:
+        print(f"unchanged skipped  {suppressed} ({suppressed / (suppressed + sent) * 100 if sent else 0:.1f}% of offered updates)")
+    if acknowledged:
+        print(f"updates acked      {acked} ({acked / ack_elapsed:.0f} updates/s, {acked / sent * 100 if sent else 0:.1f}% of sent)")
+    print(f"reconnects         {reconnects}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,288 +1,680 @@
 
+import argparse
 import sys  
 import threading
-import socket
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QDateTime
-from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QPixmap, QRadialGradient, QBrush
-from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QMessageBox
+import time
+STARTED = time.perf_counter()  # Taken before the Qt imports so the startup profile covers them
+from PyQt5.QtCore import Qt, QTimer, QEvent, QRect, QRectF, QSize, QSocketNotifier, pyqtSignal, QDateTime
+from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QImage, QPixmap, QRadialGradient, QBrush
+from PyQt5.QtWidgets import QApplication, QWidget, QLabel
+from animation import AnimationEngine, FrameScheduler
+from assets import AssetCache
+from damage import DamageTracker
+from ingest import IngestProcess, IngestServer
+from metrics import LatencyTracer, PaintStats, RateCounter, StartupProfile, StatsServer
+from protocol import TEMPERATURE_OFFSET
+from registers import Register, RegisterBank
+from render_cache import LayerCache, NeedleAtlas, RoadRenderer, TextCache
+from shm_bank import DEFAULT_NAME as SHM_DEFAULT_NAME, SharedRegisterBank
+from snapshot import StateSnapshot
+from telemetry import TelemetryRecorder, TelemetryReplay
+from trip import TripComputer
  
 MAX_SPEED = 220
 MAX_RPM = 8000
 MAX_FUEL = 100
+MIN_TEMPERATURE = -40
+MAX_TEMPERATURE = 85
+FRAME_INTERVAL_MS = 16  # Pending updates are applied at most once per frame
+TARGET_FPS = 60
+DASH_SPEED = 0.5  # Lane dash scroll rate in px/s per km/h
+ROAD_DASH_SPACING = 20
+CLUSTER_WIDTH = 1800  # Logical size everything is drawn at; a scaled cluster scales the painter
+CLUSTER_HEIGHT = 600
+ 
+# Register map shared with client.py: one row per addressable signal
+REGISTER_MAP = [
+    Register(0x00, "car_status", "Car status", decode=lambda data: "ON" if data == 0x01 else "OFF"),
+    Register(0x01, "speed", "Speed", 0, MAX_SPEED),
+    Register(0x02, "rpm", "RPM", 0, MAX_RPM),
+    Register(0x03, "fuel_level", "Fuel", 0, MAX_FUEL),
+    Register(0x04, "icon_status", "Icon status", 0, 0xFF),
+    Register(0x05, "temperature", "Temperature", MIN_TEMPERATURE + TEMPERATURE_OFFSET, MAX_TEMPERATURE + TEMPERATURE_OFFSET,
+             decode=lambda data: data - TEMPERATURE_OFFSET),
+]
+ 
+# Telltales driven by the bits of the icon status register (0x04): bit, caption, colour, position
+TELLTALES = [
+    (0, "<", QColor(0, 200, 0), QRect(370, 555, 50, 30)),  # Left indicator
+    (2, "BELT", QColor(255, 0, 0), QRect(460, 555, 70, 30)),  # Seatbelt
+    (3, "TEMP", QColor(255, 0, 0), QRect(550, 555, 70, 30)),  # Engine heat
+    (4, "P", QColor(255, 0, 0), QRect(640, 555, 50, 30)),  # Parking
+    (5, "HI", QColor(0, 120, 255), QRect(1110, 555, 50, 30)),  # High beam
+    (6, "LOCK", QColor(255, 180, 0), QRect(1180, 555, 70, 30)),  # Door locked
+    (7, "TCS", QColor(255, 180, 0), QRect(1270, 555, 70, 30)),  # Traction control
+    (1, ">", QColor(0, 200, 0), QRect(1380, 555, 50, 30)),  # Right indicator
+]
+ 
+# Images loaded after the first frame: label attribute, source file, target size
+ASSETS = [
+    ("car_label", "car_image.png", 1000, 250),
+    ("jaguar_label", "jaguar_image.png", 250, 125),
+]
+ 
+# Dial ticks as (angle, label or None), computed once rather than per static layer build
+SPEED_TICKS = [((i / MAX_SPEED) * 240 - 120, str(i) if i % 20 == 0 else None) for i in range(0, MAX_SPEED + 1, 10)]
+RPM_TICKS = [((i / MAX_RPM) * 240 - 120, f"{i // 1000}k" if i % 1000 == 0 else None) for i in range(0, MAX_RPM + 1, 500)]
+FUEL_MAJOR_TICKS = [((i / MAX_FUEL) * 210 - 35, f"{i // 100}" if i % 100 == 0 else None) for i in range(0, MAX_FUEL + 1, 50)]
+FUEL_MINOR_TICKS = [(i / MAX_FUEL) * 210 - 35 for i in range(0, MAX_FUEL + 1, 10) if i % 50 != 0]
+ 
+class ClusterResources:
+    # Caches that depend only on the scene, not on any one vehicle's state, so
+    # every cluster view in a process can share them: the static layer, fonts and
+    # laid-out text, needle sprites, the road strip and the decoded images
+    def __init__(self):
+        self.layer_cache = LayerCache()
+        self.text_cache = TextCache()
+        self.needle_atlas = NeedleAtlas()
+        self.road = RoadRenderer(spacing=ROAD_DASH_SPACING)
+        self.asset_cache = AssetCache()
+        self.images = {}
+        self.pixmaps = {}
+        self._lock = threading.Lock()
+
+    def load_image(self, path, width, height):
+        # Any thread; each (path, size) is read from the asset cache once per process
+        key = (path, width, height)
+        with self._lock:
+            if key not in self.images:
+                image = self.images[key] = self.asset_cache.load(path, width, height, Qt.KeepAspectRatio)
+                if image is None:
+                    # The cluster is fully usable without its pictures, so don't block on a dialog
+                    print(f"Error loading image: {path} is missing or unreadable")
+            return self.images[key]
+
+    def pixmap(self, image):
+        # GUI thread; views showing the same image share one pixmap
+        key = image.cacheKey()
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            pixmap = self.pixmaps[key] = QPixmap.fromImage(image)
+        return pixmap
  
 class InstrumentCluster(QWidget):
     update_values_signal = pyqtSignal(int, int, int)
+    snapshot_ready_signal = pyqtSignal()
+    asset_loaded_signal = pyqtSignal(str, QImage)
  
-    def __init__(self):
+    def __init__(self, host="localhost", port=8080, recorder=None, verbose=True, target_fps=TARGET_FPS, shared_bank=None,
+                 ingest_process=False, precise_needles=False, ingest_server=None, startup=None, scale=1.0, resources=None):
         super().__init__()
-        self.setFixedSize(1800, 600)
+        self.startup = startup
+        # A scaled cluster (e.g. one view of a dashboard wall) still lays everything out at the logical size
+        self.scale = scale
+        self.setFixedSize(round(CLUSTER_WIDTH * scale), round(CLUSTER_HEIGHT * scale))
+        self.resources = resources if resources is not None else ClusterResources()
         self.setWindowTitle("Modern Instrument Cluster")
         self.speed = 0
         self.rpm = 0
         self.fuel_level = 0
+        self.temperature = None
         self.car_position_level = 0
         self.level_positions = [170, 150, 130, 110]
         self.max_level = len(self.level_positions) - 1
         self.car_status = "OFF"
+        self.icon_status = 0
+        self.recorder = recorder
+        self.verbose = verbose
  
+        # The images are decoded off the GUI thread once the first frame is up
         self.car_label = QLabel(self)
+        self.car_label_y = None
         self.jaguar_label = QLabel(self)
-        self.load_car_pixmap()
-        self.load_jaguar_pixmap()
- 
-        self.road_y_position = 0
-        self.dash_offset = 0
+        self.assets_requested = False
+        self.assets_pending = 0
+        self.asset_loaded_signal.connect(self.asset_loaded)
+ 
+        # Lane dash scroll position in px, advanced by speed and elapsed time
+        self.dash_offset = 0.0
+        self.road = self.resources.road
+ 
+        # Needles follow the received values smoothly; digits always show the received value
+        self.animation = AnimationEngine(target_fps)
+        self.animation.add("speed", omega=10.0, epsilon=0.05)
+        self.animation.add("rpm", omega=10.0, epsilon=2.0)
+        self.animation.add("fuel_level", omega=4.0, epsilon=0.05)
+        self.needle_speed = 0.0
+        self.needle_rpm = 0.0
+        self.needle_fuel = 0.0
         self.digital_font_family = "Amasis MT Pro Black"
         self.digital_font_size = 24
+        self.layer_cache = self.resources.layer_cache
+ 
+        # Fonts are described by (family, point size, weight, italic) and built once by the text cache
+        self.text_cache = self.resources.text_cache
+        digital = self.digital_font_family
+        self.font_speed_ticks = ("Arial", 10, -1, False)
+        self.font_rpm_ticks = ("Arial", 12, -1, False)
+        self.font_fuel_ticks = (digital, 8, QFont.Bold | QFont.StyleItalic, False)
+        self.font_clock = (digital, 13, QFont.Bold, False)
+        self.font_temperature = (digital, 23, QFont.Bold, False)
+        self.font_fuel = (digital, 12, QFont.Bold | QFont.StyleItalic, False)
+        self.font_unit = (digital, 12, QFont.Bold | QFont.StyleItalic, False)
+        self.font_center = (digital, 40, QFont.Bold | QFont.StyleItalic, False)
+        self.font_digital_unit = (digital, 10, QFont.Bold | QFont.StyleItalic, False)
+        self.font_digital = (digital, 50, QFont.Bold | QFont.StyleItalic, False)
+        self.font_telltale = (digital, 11, QFont.Bold, False)
+        self.clock_minute = None
+        self.clock_layout = None
+        self.clock_layout_key = None
+ 
+        # Rolling trip figures, fed from the ingestion path. They also move on with
+        # time alone, so while the car is on they are re-read once per trip sample
+        # whether or not frames are running.
+        self.trip = TripComputer()
+        self.trip_text = self.format_trip()
+        self.trip_timer = QTimer(self)
+        self.trip_timer.setInterval(int(self.trip.interval * 1000))
+        self.trip_timer.timeout.connect(self.refresh_trip)
+ 
+        # Needles are blitted from pre-rotated sprites unless exact vector drawing is requested
+        self.precise_needles = precise_needles
+        self.needle_atlas = self.resources.needle_atlas
+        self.damage = DamageTracker(self, scale)
+        self.track_damage_regions()
  
         self.update_values_signal.connect(self.update_values)
  
-        # Start socket thread to listen for server data
-        threading.Thread(target=self.socket_listener, daemon=True).start()
- 
-        self.timer = QTimer()
+        # The ingestion thread writes into the snapshot; the GUI thread applies it once per frame
+        self.snapshot = StateSnapshot(notify=self.snapshot_ready_signal.emit)
+        # Queued even when written from the GUI thread, so a write never re-enters apply_snapshot
+        self.snapshot_ready_signal.connect(self.apply_snapshot, Qt.QueuedConnection)
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.setSingleShot(True)
+        self.snapshot_timer.timeout.connect(self.apply_snapshot)
+        self.last_snapshot_time = 0.0
+        self.latency = LatencyTracer()
+        # Counters served by the optional stats endpoint
+        self.messages = RateCounter()
+        self.paint_stats = PaintStats()
+ 
+        # Decoded register changes flow into the snapshot; switching the car off also zeroes speed and RPM
+        self.registers = RegisterBank(REGISTER_MAP)
+        self.registers.on_change(self.register_changed)
+        self.registers.on_change(self.car_status_changed, "car_status")
+        self.registers.on_reject = self.register_rejected
+        # Socket, shared memory and replay updates all go through ingest_updates() under this lock
+        self.ingest_lock = threading.Lock()
+ 
+        # Frame timer: runs at the target frame rate only while something is moving;
+        # the scheduler starts and stops it as the car state changes
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(int(1000 / target_fps))
         self.timer.timeout.connect(self.update_positions)
-        self.timer.start(100)
+        self.scheduler = FrameScheduler(self.timer, self.animation)
+ 
+        # The clock only needs a repaint when the minute changes
+        self.clock_timer = QTimer(self)
+        self.clock_timer.setSingleShot(True)
+        self.clock_timer.timeout.connect(self.update_clock)
+        self.update_clock()
+ 
+        # Same-host producers can write registers into shared memory instead; the
+        # scheduler polls it once per frame while anything is moving or changing
+        self.shared_bank = shared_bank
+        self.shared_timer = QTimer(self)
+        self.shared_timer.setTimerType(Qt.PreciseTimer)
+        self.shared_timer.timeout.connect(self.read_shared_bank)
+        if shared_bank is not None:
+            self.scheduler.attach_poll(self.shared_timer, int(1000 / target_fps))
+ 
+        # main() binds the listener before building the widget; otherwise it is bound here.
+        # Attached last: producers that connected early are delivered straight away,
+        # so everything ingest_updates() touches must exist by now.
+        self.ingest_server = None
+        self.ingest_notifier = None
+        if ingest_server is None and port is not None:
+            ingest_server = create_ingest_server(host, port, ingest_process, verbose)
+        if ingest_server is not None:
+            self.attach_ingest_server(ingest_server)
  
         # Update positions initially to ensure images are displayed
         self.update_car_position()
         self.update_jaguar_position()
        
  
-    def socket_listener(self):
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.bind(('localhost', 8080))
-        server_socket.listen(1)
-        print("Server is listening on port 8080...")
-        client_socket, client_address = server_socket.accept()
-        print(f"Client connected: {client_address}")
- 
-        while True:
-            data = client_socket.recv(1024).decode()
-            if data:
-                print(f"Received: {data}")  # Print the received data
-                try:
-                    address_hex, data_hex = data.split()
-                    address = int(address_hex, 16)
-                    data = int(data_hex, 16)
- 
-                    if address == 0x00:  # Car Status
-                        self.car_status = "ON" if data == 0x01 else "OFF"
-                        print(f"Car status set to: {self.car_status}")
-                        if self.car_status == "OFF":
-                            self.speed = 0
-                            self.rpm = 0
-                            self.update()
-                       
-                    elif address == 0x01:  # Speed
-                        if 0 <= data <= MAX_SPEED:
-                            self.speed = data
-                            print(f"Speed set to: {self.speed}")
-                        else:
-                            print("Invalid speed received.")
- 
-                    elif address == 0x02:  # RPM
-                        if 0 <= data <= MAX_RPM:
-                            self.rpm = data
-                            print(f"RPM set to: {self.rpm}")
-                        else:
-                            print("Invalid RPM received.")
- 
-                    elif address == 0x03:  # Fuel
-                        if 0 <= data <= MAX_FUEL:
-                            self.fuel_level = data
-                            print(f"Fuel set to: {self.fuel_level}")
-                        else:
-                            print("Invalid Fuel received.")
- 
-                    self.update_values_signal.emit(self.speed, self.rpm, self.fuel_level)
-                   
- 
-                except ValueError:
-                    print("Invalid data received from client:", data)
- 
- 
-    # Other methods (load_car_pixmap, update_car_position, paintEvent, etc.) remain unchanged        
- 
-    def load_car_pixmap(self):
-        try:
-            self.car_pixmap = QPixmap("car_image.png").scaled(1000, 250, Qt.KeepAspectRatio)
-            if not self.car_pixmap.isNull():
-                self.car_label.setPixmap(self.car_pixmap)
-            else:
-                raise Exception("Image is null")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Error loading image: {e}")
-            self.car_pixmap = QPixmap()
-        pass
- 
-    def load_jaguar_pixmap(self):
-        try:
-            self.jaguar_pixmap = QPixmap("jaguar_image.png").scaled(250, 125, Qt.KeepAspectRatio)
-            if not self.jaguar_pixmap.isNull():
-                self.jaguar_label.setPixmap(self.jaguar_pixmap)
-            else:
-                raise Exception("Image is null")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Error loading image: {e}")
-            self.jaguar_pixmap = QPixmap()
-        pass
+    def attach_ingest_server(self, server):
+        # Start delivering from a server made by create_ingest_server(). Producers
+        # that connected in the meantime were queued by the listen backlog.
+        self.ingest_server = server
+        if isinstance(server, IngestProcess):
+            # receive() also picks up the ready message of a worker nobody waited for
+            self.ingest_notifier = QSocketNotifier(server.fileno(), QSocketNotifier.Read, self)
+            self.ingest_notifier.activated.connect(self.receive_from_worker)
+        else:
+            server.on_frames = self.ingest_frames
+            server.on_invalid = self.report_invalid
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+ 
+    def ingest_frames(self, connection, frames):
+        # Runs on the ingestion thread; updates from every producer are merged into one cluster state
+        traced = False
+        for frame in frames:
+            if frame.seq is not None:
+                connection.last_seq = self.latency.frame_received(
+                    connection.last_seq, frame.seq, frame.sent_ns, connection.recv_ns, connection.decode_ns,
+                    [address for address, _ in frame.updates])
+                traced = True
+            self.ingest_updates(frame.updates)
+        if traced:
+            # Traced frames must reach the GUI thread even if they changed nothing
+            self.snapshot.wake()
+ 
+    def ingest_updates(self, updates):
+        # Single entry point for decoded updates, shared by the socket server, shared memory and telemetry replay.
+        # Only updates the register bank accepted are recorded, so the log never sees unknown addresses.
+        write = self.registers.write
+        counts = self.messages.counts
+        accepted = []
+        with self.ingest_lock:
+            for address, value in updates:
+                counts[address] = counts.get(address, 0) + 1
+                if write(address, value):
+                    accepted.append((address, value))
+        if self.recorder is not None and accepted:
+            self.recorder.record(accepted)
+ 
+    def receive_from_worker(self):
+        # GUI thread, when the ingestion worker process has sent something
+        updates, traces = self.ingest_server.receive()
+        if not self.ingest_server.alive:
+            # Nothing more will arrive: say why and end with a failure status
+            self.ingest_notifier.setEnabled(False)
+            print(f"Ingestion worker failed: {self.ingest_server.error}")
+            QApplication.exit(1)
+        for trace in traces:
+            self.latency.frame_received(*trace)
+        if updates:
+            self.ingest_updates(updates)
+        if traces:
+            self.snapshot.wake()
+ 
+    def read_shared_bank(self):
+        # Costs one 8-byte read when no producer has written since the last poll
+        updates = self.shared_bank.read()
+        if updates:
+            self.ingest_updates(updates)
+        self.scheduler.polled(bool(updates))
+ 
+    def report_invalid(self, connection, data):
+        print("Invalid data received from client:", data)
+ 
+    def register_changed(self, register, value):
+        # Runs on the ingestion thread, so decoded values go into the snapshot rather than onto the widget
+        self.snapshot.write(register.name, value)
+        self.trip.update(register.name, value)
+        if self.verbose:
+            print(f"{register.label} set to: {value}")
+ 
+    def car_status_changed(self, register, value):
+        if value == "OFF":
+            self.registers.write_named("speed", 0)
+            self.registers.write_named("rpm", 0)
+ 
+    def register_rejected(self, register, data):
+        print(f"Invalid {register.label} received: {data}")
+ 
+    def apply_snapshot(self):
+        # Hold back until a frame interval has passed since the last apply; anything
+        # that arrives in the meantime is coalesced into the next take()
+        remaining = FRAME_INTERVAL_MS - (time.monotonic() - self.last_snapshot_time) * 1000
+        if remaining > 0:
+            if not self.snapshot_timer.isActive():
+                self.snapshot_timer.start(int(remaining) + 1)
+            return
+        self.last_snapshot_time = time.monotonic()
+        # Traces decoded from here on may be applied now but are only counted as delivered next time
+        self.latency.delivered(time.time_ns())
+        for name, value in self.snapshot.take().items():
+            setattr(self, name, value)
+        self.state_changed()
+        if not self.damage.pending:
+            # Nothing visible changed, so what is on screen already reflects these updates
+            self.latency.painted(time.time_ns())
+ 
+    def state_changed(self):
+        for name in ("speed", "rpm", "fuel_level"):
+            self.animation.set_target(name, getattr(self, name))
+        if self.scheduler.wake(self.car_status == "ON", self.road_moving()) == "off":
+            # The scheduler settled the needles at their targets
+            self.update_needles()
+        if self.car_status != "ON":
+            self.trip_timer.stop()
+        elif not self.trip_timer.isActive():
+            self.trip_timer.start()
+        self.trip_text = self.format_trip()
+        self.damage.refresh()
+
+    def refresh_trip(self):
+        self.trip_text = self.format_trip()
+        self.damage.refresh()
+ 
+    def update_needles(self):
+        self.needle_speed = self.animation.value("speed")
+        self.needle_rpm = self.animation.value("rpm")
+        self.needle_fuel = self.animation.value("fuel_level")
+ 
+    def format_trip(self):
+        # The trip lines as displayed; they only cause a repaint when the text changes
+        trip = self.trip.summary()
+        average = "--" if trip["average_speed"] is None else f"{trip['average_speed']:.0f}"
+        range_km = "--" if trip["range_km"] is None else f"{trip['range_km']:.0f}"
+        # Fuel is metered as a percentage of the tank, so consumption is in tank percent too
+        rate = "--" if trip["fuel_per_100km"] is None else f"{trip['fuel_per_100km']:.1f}"
+        return f"AVG {average} km/h", f"MAX {trip['max_rpm']} RPM", f"RANGE {range_km} km", f"FUEL {rate} %/100km"
+ 
+    def road_moving(self):
+        return self.car_status == "ON" and self.speed > 0
+ 
+    def collect_metrics(self):
+        # Called on the stats server's thread; only reads counters
+        registers = self.registers
+        server = self.ingest_server
+        ingest = {
+            "messages_per_second": {f"{address:#04x}": rate for address, rate in sorted(self.messages.rates().items())},
+            "messages_total": {f"{address:#04x}": count for address, count in sorted(self.messages.counts.copy().items())},
+        }
+        if server is not None:
+            ingest.update(server.stats())
+        render = self.paint_stats.summary()
+        render["repainted_pixels_per_second"] = self.damage.pixel_rate()
+        render["repainted_pixels"] = self.damage.repainted_pixels
+        render["animation_frames"] = self.animation.frames
+        render["dropped_frames"] = self.animation.dropped_frames
+        render["layer_builds"] = self.layer_cache.builds
+        render["needle_sprite_builds"] = self.needle_atlas.builds
+        render["needle_sprite_bytes"] = self.needle_atlas.bytes
+        render["scheduler"] = self.scheduler.summary()
+        if self.shared_bank is not None:
+            ingest["shared_memory_reads"] = self.shared_bank.reads
+            ingest["shared_memory_retries"] = self.shared_bank.retries
+        asset_cache = self.resources.asset_cache
+        assets = {"cache_hits": asset_cache.hits, "cache_misses": asset_cache.misses}
+        if self.startup is not None:
+            assets["startup_ms"] = self.startup.summary()
+        return {
+            "ingest": ingest,
+            "registers": {
+                "rejected": registers.rejected,
+                "rejected_by_address": {
+                    f"{register.address:#04x}": registers.rejected_by_address[register.address]
+                    for register in registers.names.values()
+                },
+                "unknown_address": registers.unknown,
+            },
+            "snapshot": self.snapshot.counters(),
+            "render": render,
+            "latency": self.latency.summary(),
+            "startup": assets,
+            "trip": self.trip.summary(),
+        }
+ 
+    def load_assets(self):
+        # Decoding and scaling (or reading the pre-scaled cache) happens on a worker thread;
+        # each image is handed back to the GUI thread as it becomes ready
+        self.assets_requested = True
+        self.assets_pending = len(ASSETS)
+        threading.Thread(target=self.load_assets_worker, daemon=True).start()
+ 
+    def load_assets_worker(self):
+        for name, path, width, height in ASSETS:
+            image = self.resources.load_image(path, round(width * self.scale), round(height * self.scale))
+            if image is None:
+                image = QImage()
+            self.asset_loaded_signal.emit(name, image)
+ 
+    def asset_loaded(self, name, image):
+        if not image.isNull():
+            label = getattr(self, name)
+            label.setPixmap(self.resources.pixmap(image))
+            label.adjustSize()
+        self.assets_pending -= 1
+        if self.assets_pending == 0 and self.startup is not None:
+            self.startup.mark("assets loaded")
+            if self.verbose:
+                print(self.startup.report())
  
     def update_car_position(self):
         # Always keep the car at the bottom of the cluster
         new_position_y = self.level_positions[self.car_position_level]
-        self.car_label.move(740, new_position_y)
+        if new_position_y != self.car_label_y:
+            self.car_label_y = new_position_y
+            self.car_label.move(round(740 * self.scale), round(new_position_y * self.scale))
         pass
  
     def update_jaguar_position(self):
         # Position the Jaguar in the middle of the cluster
-        jaguar_x = (self.width() - self.jaguar_label.width()-75) // 2
+        jaguar_x = (CLUSTER_WIDTH - round(self.jaguar_label.width() / self.scale)-75) // 2
         jaguar_y = 30  # Adjust as needed for vertical positioning
-        self.jaguar_label.move(jaguar_x, jaguar_y)
+        self.jaguar_label.move(round(jaguar_x * self.scale), round(jaguar_y * self.scale))
         pass
  
     def update_positions(self):
-        if self.car_status == "ON" and self.speed > 0:
-            self.road_y_position = (self.road_y_position + int(self.speed * 0.2)) % self.height()
-            self.update()
+        # One animation frame: everything advances by the elapsed time, not by a fixed step per tick
+        dt = self.animation.tick()
+        self.update_needles()
+        if self.road_moving():
+            self.dash_offset = (self.dash_offset + self.speed * DASH_SPEED * dt) % ROAD_DASH_SPACING
+        self.damage.refresh()
         self.update_car_position()  # Ensure the car position is updated
+        self.scheduler.frame(self.car_status == "ON", self.road_moving())
+ 
+    def update_clock(self):
+        # The date block is laid out again on the next paint
+        self.clock_minute = int(time.time() // 60)
+        self.damage.refresh()
+        # Wake up again just after the next minute boundary
+        self.clock_timer.start(60000 - int(time.time() * 1000) % 60000 + 50)
+ 
+    def track_damage_regions(self):
+        # Bounding rect of every part of the scene that can change, with the state it depends on
+        self.damage.track("status", QRect(0, 0, CLUSTER_WIDTH, CLUSTER_HEIGHT), lambda: self.car_status)
+        self.damage.track("speed", QRect(300, 175, 400, 310), lambda: (self.speed, round(self.needle_speed, 1)))
+        self.damage.track("clock", QRect(104, 185, 252, 190), lambda: (self.clock_minute, self.temperature))
+        self.damage.track("trip_average", QRect(120, 375, 160, 30), lambda: self.trip_text[0])
+        self.damage.track("rpm", QRect(1100, 175, 400, 310), lambda: (self.rpm, round(self.needle_rpm, -1)))
+        self.damage.track("fuel", QRect(1396, 131, 308, 308), lambda: (self.fuel_level, round(self.needle_fuel, 1)))
+        self.damage.track("trip_fuel", QRect(1450, 300, 190, 62), lambda: self.trip_text[1:])
+        self.damage.track("road", QRect(895, 145, 10, 310), lambda: int(self.dash_offset))
+        self.damage.track("digital_speed", QRect(780, 465, 240, 85), lambda: self.speed)
+        self.damage.track("telltales_left", QRect(365, 550, 330, 40), lambda: self.icon_status)
+        self.damage.track("telltales_right", QRect(1105, 550, 330, 40), lambda: self.icon_status)
  
  
     def paintEvent(self, event):
+        paint_start = time.perf_counter()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
-        self.draw_background(painter)
-        self.draw_road(painter)
-        self.draw_speedometer(painter, 500, 375, 220)
-        self.draw_rpm_meter(painter, 1300, 375, 220)
-        self.draw_digital_speed(painter)
+        if self.scale != 1.0:
+            painter.scale(self.scale, self.scale)
+        # Dials, ticks, labels and the background never change between frames,
+        # so they come from a cached pixmap and only the moving parts are drawn
+        static_layer = self.layer_cache.get("static", QSize(CLUSTER_WIDTH, CLUSTER_HEIGHT), self.render_ratio(), self.draw_static_layer)
+        painter.drawPixmap(0, 0, static_layer)
+ 
+        # Skip every gauge that lies outside the damaged region
+        damaged = event.region()
+        if self.damage.intersects(damaged, "road"):
+            self.draw_road(painter)
+        if self.damage.intersects(damaged, "speed", "clock", "trip_average"):
+            self.draw_speedometer(painter, 500, 375, 220)
+        if self.damage.intersects(damaged, "rpm", "fuel", "trip_fuel"):
+            self.draw_rpm_meter(painter, 1300, 375, 220)
+        if self.damage.intersects(damaged, "digital_speed"):
+            self.draw_digital_speed(painter)
+        if self.damage.intersects(damaged, "telltales_left", "telltales_right"):
+            self.draw_telltales(painter)
  
         if self.car_status == "OFF":
             # Darken the cluster when the car is OFF
             painter.setBrush(QColor(0, 0, 0, 225))  # Semi-transparent black
-            painter.drawRect(0, 0, self.width(), self.height())
+            painter.drawRect(0, 0, CLUSTER_WIDTH, CLUSTER_HEIGHT)
+ 
+        self.damage.record_paint(damaged)
+        self.latency.painted(time.time_ns())
+        self.paint_stats.add(time.perf_counter() - paint_start)
+        if not self.assets_requested:
+            if self.startup is not None:
+                self.startup.mark("first frame")
+            # Deferred until this frame is on screen
+            self.assets_requested = True
+            QTimer.singleShot(0, self.load_assets)
+ 
+    def render_ratio(self):
+        # Device pixels per logical pixel, for the pre-rendered pixmaps
+        return self.devicePixelRatioF() * self.scale
+ 
+    def changeEvent(self, event):
+        # Palette or style changes alter the theme, so the cached layers are stale
+        if event.type() in (QEvent.PaletteChange, QEvent.StyleChange, QEvent.FontChange):
+            self.layer_cache.invalidate()
+            self.update()
+        super().changeEvent(event)
+ 
+    def draw_static_layer(self, painter):
+        self.draw_background(painter)
+        self.draw_road_edges(painter)
+        self.draw_speedometer_dial(painter, 500, 375, 220)
+        self.draw_rpm_dial(painter, 1300, 375, 220)
+        self.draw_digital_speed_unit(painter)
  
     def draw_background(self, painter):
-        gradient = QRadialGradient(self.width() / 2, self.height() / 2, 600)
+        gradient = QRadialGradient(CLUSTER_WIDTH / 2, CLUSTER_HEIGHT / 2, 600)
         gradient.setColorAt(0, QColor(0, 0, 150))
         gradient.setColorAt(1, QColor(0, 0, 50))
         painter.setBrush(QBrush(gradient))
-        painter.drawRect(0, 0, self.width(), self.height())
+        painter.drawRect(0, 0, CLUSTER_WIDTH, CLUSTER_HEIGHT)
  
-    def draw_road(self, painter):
+    def draw_road_edges(self, painter):
         road_top_y = 150
-        road_bottom_y = self.height() - 150
-        road_left_x = int(self.width() / 2 - 80)
-        road_right_x = int(self.width() / 2 + 80)
+        road_bottom_y = CLUSTER_HEIGHT - 150
+        road_left_x = int(CLUSTER_WIDTH / 2 - 80)
+        road_right_x = int(CLUSTER_WIDTH / 2 + 80)
  
         painter.setPen(QPen(QColor(255, 255, 255), 5))
         painter.drawLine(road_left_x, road_top_y, road_left_x, road_bottom_y)
         painter.drawLine(road_right_x, road_top_y, road_right_x, road_bottom_y)
  
-        dash_length = 3
-        spacing = 20
-        lane_x = int(self.width() / 2)
- 
-        for y in range(road_top_y + self.dash_offset, road_bottom_y, spacing):
-            painter.drawLine(lane_x, y, lane_x, y + dash_length)
- 
-        if self.speed > 0:
-            self.dash_offset = (self.dash_offset + 5) % spacing
+    def draw_road(self, painter):
+        road_top_y = 150
+        road_bottom_y = CLUSTER_HEIGHT - 150
+        lane_x = int(CLUSTER_WIDTH / 2)
+        self.road.draw(painter, lane_x, road_top_y, road_bottom_y, self.dash_offset, self.render_ratio())
  
-    def draw_speedometer(self, painter, x, y, radius):
+    def draw_speedometer_dial(self, painter, x, y, radius):
         painter.setPen(QPen(QColor(0, 150, 255), 10))
         painter.drawArc(x - radius, y - radius, 2 * radius, 2 * radius, -30 * 16, 240 * 16)
  
         painter.setPen(QPen(Qt.white, 3))
-        painter.setFont(QFont("Arial", 10))
+        painter.setFont(self.text_cache.font(self.font_speed_ticks))
  
-        for i in range(0, MAX_SPEED + 1, 10):
-            angle = (i / MAX_SPEED) * 240 - 120
+        for angle, label in SPEED_TICKS:
             painter.save()
             painter.translate(x, y)
             painter.rotate(angle)
-            if i % 20 == 0:
+            if label is not None:
                 painter.drawLine(0, -radius + 20, 0, -radius + 40)
-                painter.drawText(-15, -radius + 60, str(i))
+                painter.drawText(-15, -radius + 60, label)
             else:
                 painter.drawLine(0, -radius + 30, 0, -radius + 40)
             painter.restore()
  
-        self.draw_center_speed(painter, x, y, self.speed, "km/h")
-        self.draw_dynamic_needle(painter, x, y, radius - 30, self.speed, max_value=MAX_SPEED)
+        self.draw_center_dial(painter, x, y, "km/h")
+        self.draw_small_gauge_dial(painter, int(x - 250), int(y - 90), int(radius // 1.5))
+ 
+    def draw_speedometer(self, painter, x, y, radius):
+        self.draw_center_speed(painter, x, y, self.speed)
+        self.draw_dynamic_needle(painter, x, y, radius - 30, self.needle_speed, max_value=MAX_SPEED)
  
         self.draw_small_gauge(painter, int(x - 250), int(y - 90), int(radius // 1.5))  # Small gauge
  
-    def draw_small_gauge(self, painter, x, y, radius):
+    def draw_small_gauge_dial(self, painter, x, y, radius):
         painter.setPen(QPen(QColor(0, 150, 255), 8))
         painter.drawArc(int(x - radius), int(y - radius), int(2 * radius), int(2 * radius), 38 * 16, 245 * 16)  # Inclined semicircle
  
-    # Draw the current date and time
+    def draw_small_gauge(self, painter, x, y, radius):
+        # Draw the current date, time and temperature; the block is only laid out again when the minute
+        # or the temperature changes
+        layout_key = (self.clock_minute, self.temperature)
+        if self.clock_layout_key != layout_key:
+            self.clock_layout = self.layout_clock(x, y, radius)
+            self.clock_layout_key = layout_key
+        painter.setPen(Qt.white)
+        for spec, text_x, text_y, text in self.clock_layout:
+            self.text_cache.draw(painter, spec, text_x, text_y, text)
+        # Rolling average speed from the trip computer
+        self.text_cache.draw_centered(painter, self.font_digital_unit, x - 50, int(y + radius / 4 + 70), self.trip_text[0])
+ 
+    def layout_clock(self, x, y, radius):
+        # Returns (font spec, x, baseline y, text) for each line of the date block
         current_time = QDateTime.currentDateTime()
         date_text = current_time.toString("dddd")  # Full day of the week
         month_year_text = current_time.toString("MMMM yyyy")  # Full month and year
         time_text = current_time.toString("h:mm AP")  # 12-hour format with AM/PM
  
-        # Example temperature (you can replace this with actual temperature data)
-        temperature = 21  # In Celsius
-        temperature_text = f"{temperature} °C"
-   
-        painter.setPen(Qt.white)
-        painter.setFont(QFont("Amasis MT Pro Black", 13, QFont.Bold))  # Make the font bold
+        # Temperature register (0x05), in Celsius
+        temperature_text = "-- °C" if self.temperature is None else f"{self.temperature} °C"
  
     # Calculate text widths
-        date_width = painter.fontMetrics().width(date_text)
-        month_year_width = painter.fontMetrics().width(month_year_text)
-        time_width = painter.fontMetrics().width(time_text)
-        temperature_width = painter.fontMetrics().width(temperature_text)
+        width = self.text_cache.width
+        date_width = width(self.font_clock, date_text)
+        month_year_width = width(self.font_clock, month_year_text)
+        time_width = width(self.font_clock, time_text)
+        temperature_width = width(self.font_temperature, temperature_text)
  
-    # Draw date and time centered in the gauge
+    # Centre date and time in the gauge
         line_spacing=5
-        painter.drawText(int(x - date_width / 2-25), int(y + radius / 4-100), date_text)  # Day on the first line
-        painter.drawText(int(x - month_year_width / 2-25), int(y + radius / 4 - 80+line_spacing), month_year_text)# Month and year on the second line
-        painter.drawText(int(x - time_width / 2-35), int(y + radius / 4 - 60+(line_spacing+20)), time_text)  # Time on the third line
- 
-        painter.setFont(QFont("Amasis MT Pro Black", 23, QFont.Bold))  # Larger font for temperature
-        temperature_width = painter.fontMetrics().width(temperature_text)
-        painter.drawText(int(x - temperature_width / 2-50), int(y + radius / 4 + 1.5 * (line_spacing + 20)), temperature_text)  # Temperature on the fourth line
- 
-    def draw_rpm_meter(self, painter, x, y, radius):
+        return [
+            (self.font_clock, int(x - date_width / 2-25), int(y + radius / 4-100), date_text),  # Day on the first line
+            (self.font_clock, int(x - month_year_width / 2-25), int(y + radius / 4 - 80+line_spacing), month_year_text),  # Month and year on the second line
+            (self.font_clock, int(x - time_width / 2-35), int(y + radius / 4 - 60+(line_spacing+20)), time_text),  # Time on the third line
+            (self.font_temperature, int(x - temperature_width / 2-50), int(y + radius / 4 + 1.5 * (line_spacing + 20)), temperature_text),  # Temperature on the fourth line
+        ]
+ 
+    def draw_rpm_dial(self, painter, x, y, radius):
         painter.setPen(QPen(QColor(0, 150, 255), 10))
         painter.drawArc(x - radius, y - radius, 2 * radius, 2 * radius, -30 * 16, 240 * 16)
  
         painter.setPen(QPen(Qt.white, 3))
-        painter.setFont(QFont("Arial", 12))
+        painter.setFont(self.text_cache.font(self.font_rpm_ticks))
  
-        for i in range(0, MAX_RPM + 1, 500):
-            angle = (i / MAX_RPM) * 240 - 120
+        for angle, label in RPM_TICKS:
             painter.save()
             painter.translate(x, y)
             painter.rotate(angle)
-            if i % 1000 == 0:
+            if label is not None:
                 painter.drawLine(0, -radius + 20, 0, -radius + 40)
-                painter.drawText(-15, -radius + 70, f"{i // 1000}k")
+                painter.drawText(-15, -radius + 70, label)
             else:
                 painter.drawLine(0, -radius + 30, 0, -radius + 40)
             painter.restore()
  
-        self.draw_center_speed(painter, x, y, self.rpm, "RPM")
-        self.draw_dynamic_needle(painter, x, y, radius - 30, self.rpm, max_value=MAX_RPM)
+        self.draw_center_dial(painter, x, y, "RPM")
+        self.draw_rpm_small_gauge_dial(painter, int(x + 250), int(y - 90), int(radius // 1.5))
+ 
+    def draw_rpm_meter(self, painter, x, y, radius):
+        self.draw_center_speed(painter, x, y, self.rpm)
+        self.draw_dynamic_needle(painter, x, y, radius - 30, self.needle_rpm, max_value=MAX_RPM)
  
         self.draw_rpm_small_gauge(painter, int(x + 250), int(y - 90), int(radius // 1.5))  # Small gauge for RPM
  
-    def draw_rpm_small_gauge(self, painter, x, y, radius):
+    def draw_rpm_small_gauge_dial(self, painter, x, y, radius):
         painter.setPen(QPen(QColor(255, 0, 0), 8))
         painter.drawArc(int(x - radius), int(y - radius), int(2 * radius), int(2 * radius), 258 * 16, 245 * 16)  # Inclined semicircle
  
-        painter.setPen(QPen(Qt.white, 3))
-        painter.setFont(QFont("Amasis MT Pro Black", 12))
-        # Draw the fuel indicator
-        fuel_angle = (self.fuel_level / 100) * 245  # Map fuel level to angle
-        painter.setPen(QPen(QColor(0, 150, 255), 8))  # Color for fuel indicator (gold)
-        painter.drawArc(int(x - radius), int(y - radius), int(2 * radius), int(2 * radius), 258 * 16, int(fuel_angle * 16))
- 
         painter.setPen(Qt.white)
-        painter.setFont(QFont(self.digital_font_family, 8, QFont.Bold | QFont.StyleItalic))
+        painter.setFont(self.text_cache.font(self.font_fuel_ticks))
         painter.setPen(QPen(QColor(255, 255, 255), 2))
         painter.drawArc(x - 100, y - 87, 180, 180, 258 * 16, 245 * 16)
  
@@ -291,100 +683,114 @@ class InstrumentCluster(QWidget):
         tick_length_minor = radius * 0.1    # Minor ticks (for every 10 units)
  
         # Draw major ticks and labels
-        for i in range(0, MAX_FUEL + 1, 50):
-            angle = (i / MAX_FUEL) * 210 - 35
+        for angle, label in FUEL_MAJOR_TICKS:
             painter.save()
             painter.translate(x, y)
             painter.rotate(angle)
             # Ensure the tick length is converted to int
             painter.drawLine(0, int(-radius + 20), 0, int(-radius + 20 + tick_length_major))
-            if i % 100 == 0:
-                painter.drawText(-15, int(-radius + 70), f"{i // 100}")
+            if label is not None:
+                painter.drawText(-15, int(-radius + 70), label)
             painter.restore()
  
         # Draw minor ticks
-        for i in range(0, MAX_FUEL + 1, 10):
-            if i % 50 != 0:  # Skip the major ticks
-                angle = (i / MAX_FUEL) * 210 - 35
-                painter.save()
-                painter.translate(x, y)
-                painter.rotate(angle)
-                # Ensure the tick length is converted to int
-                painter.drawLine(0, int(-radius + 20), 0, int(-radius + 20 + tick_length_minor))
-                painter.restore()
+        for angle in FUEL_MINOR_TICKS:
+            painter.save()
+            painter.translate(x, y)
+            painter.rotate(angle)
+            # Ensure the tick length is converted to int
+            painter.drawLine(0, int(-radius + 20), 0, int(-radius + 20 + tick_length_minor))
+            painter.restore()
  
-        # Draw the needle
-        needle_angle = (self.fuel_level / MAX_FUEL) * 210 - 35  # Adjusted to match ticks
-        painter.save()
-        painter.translate(x, y)
-        painter.rotate(needle_angle)
+    def draw_rpm_small_gauge(self, painter, x, y, radius):
+        # Draw the fuel indicator
+        fuel_angle = (self.needle_fuel / 100) * 245  # Map fuel level to angle
+        painter.setPen(QPen(QColor(0, 150, 255), 8))  # Color for fuel indicator (gold)
+        painter.drawArc(int(x - radius), int(y - radius), int(2 * radius), int(2 * radius), 258 * 16, int(fuel_angle * 16))
  
+        # Draw the needle
+        needle_angle = (self.needle_fuel / MAX_FUEL) * 210 - 35  # Adjusted to match ticks
         # Set needle color based on fuel level
-        if self.fuel_level < 20:
-            painter.setPen(QPen(QColor(255, 0, 0), 2))  # Red for low fuel
-        else:
-            painter.setPen(QPen(QColor(255, 255, 255), 2))  # White for normal fuel
+        color = QColor(255, 0, 0) if self.needle_fuel < 20 else QColor(255, 255, 255)  # Red for low fuel
+        length = radius - 30  # Needle length
  
-        painter.drawLine(0, 0, 0, -radius + 30)  # Needle length
+        painter.save()
+        if self.precise_needles:
+            painter.translate(x, y)
+            painter.rotate(needle_angle)
+            self.paint_fuel_needle(painter, length, color)
+        else:
+            self.needle_atlas.draw(painter, x, y, needle_angle, ("fuel", length, color.rgb()), QRectF(-2, -length - 2, 4, length + 4),
+                                   lambda sprite: self.paint_fuel_needle(sprite, length, color), self.render_ratio())
         painter.restore()
        
         # Optionally, you could draw a label for the fuel level
         painter.setPen(QPen(Qt.white, 150))
-        painter.setFont(QFont(self.digital_font_family, 12, QFont.Bold | QFont.StyleItalic))
-        painter.drawText(int(x - 20), int(y + 10), f"{self.fuel_level}%")  # Display fuel level percentage
+        self.text_cache.draw(painter, self.font_fuel, int(x - 20), int(y + 10), f"{self.fuel_level}%")  # Display fuel level percentage
+        # Peak RPM, estimated range and fuel consumption from the trip computer
+        self.text_cache.draw_centered(painter, self.font_digital_unit, x - 5, int(y + 32), self.trip_text[1])
+        self.text_cache.draw_centered(painter, self.font_digital_unit, x - 5, int(y + 50), self.trip_text[2])
+        self.text_cache.draw_centered(painter, self.font_digital_unit, x - 5, int(y + 68), self.trip_text[3])
+ 
+    def paint_fuel_needle(self, painter, length, color):
+        painter.setPen(QPen(color, 2))
+        painter.drawLine(0, 0, 0, -length)
  
     def draw_dynamic_needle(self, painter, x, y, radius, value, max_value):
         needle_angle = (value / max_value) * 240 - 120
         color = QColor(255, 255, 255) if value < max_value * 0.6 else QColor(255, 100, 100)
  
-        painter.setPen(QPen(Qt.black, 2))
         painter.save()
-        painter.translate(x, y)
-        painter.rotate(needle_angle)
-        painter.drawLine(0, 0, 0, -radius)  # Draw the needle line for the border
+        if self.precise_needles:
+            painter.translate(x, y)
+            painter.rotate(needle_angle)
+            self.paint_gauge_needle(painter, radius, color)
+        else:
+            self.needle_atlas.draw(painter, x, y, needle_angle, ("gauge", radius, color.rgb()), QRectF(-3, -radius - 3, 6, radius + 6),
+                                   lambda sprite: self.paint_gauge_needle(sprite, radius, color), self.render_ratio())
         painter.restore()
  
+    def paint_gauge_needle(self, painter, radius, color):
+        painter.setPen(QPen(Qt.black, 2))
+        painter.drawLine(0, 0, 0, -radius)  # Draw the needle line for the border
         painter.setPen(QPen(color, 3))
-        painter.save()
-        painter.translate(x, y)
-        painter.rotate(needle_angle)
         painter.drawLine(0, 0, 0, -radius + 15)  # Offset needle to ensure it doesn't overlap with the center arc
-        painter.restore()
  
-    def draw_center_speed(self, painter, x, y, value, unit):
-        painter.setPen(Qt.white)
-        painter.setFont(QFont(self.digital_font_family, 40, QFont.Bold | QFont.StyleItalic))
+    def draw_center_dial(self, painter, x, y, unit):
         painter.setPen(QPen(QColor(255, 255, 255), 2))
         painter.drawArc(x - 120, y - 120, 240, 240, -30 * 16, 240 * 16)
  
-        speed_text = str(value)
-        speed_width = painter.fontMetrics().width(speed_text)
-        painter.drawText(int(x - speed_width / 2), int(y + 20), speed_text)
+        painter.setPen(QColor(255, 255, 255))
+        self.text_cache.draw_centered(painter, self.font_unit, x, int(y + 50), unit)
  
+    def draw_center_speed(self, painter, x, y, value):
+        painter.setPen(QPen(QColor(255, 255, 255), 2))
+        self.text_cache.draw_centered(painter, self.font_center, x, int(y + 20), str(value))
+ 
+    def draw_digital_speed_unit(self, painter):
+        digital_speed_position_y = CLUSTER_HEIGHT - 60
         painter.setPen(QColor(255, 255, 255))
-        painter.setFont(QFont(self.digital_font_family, 12, QFont.Bold | QFont.StyleItalic))
-        unit_width = painter.fontMetrics().width(unit)
-        painter.drawText(int(x - unit_width / 2), int(y + 50), unit)
+        self.text_cache.draw_centered(painter, self.font_digital_unit, CLUSTER_WIDTH / 2, int(digital_speed_position_y + 30), "kmph")
  
     def draw_digital_speed(self, painter):
-        digital_speed_position_y = self.height() - 60
+        digital_speed_position_y = CLUSTER_HEIGHT - 60
         painter.setPen(Qt.white)
-        painter.setFont(QFont(self.digital_font_family, 50, QFont.Bold | QFont.StyleItalic))
-        speed_text = str(self.speed)
-        speed_width = painter.fontMetrics().width(speed_text)
-        painter.drawText(int((self.width() - speed_width) / 2), int(digital_speed_position_y), speed_text)
+        self.text_cache.draw_centered(painter, self.font_digital, CLUSTER_WIDTH / 2, int(digital_speed_position_y), str(self.speed))
  
-        painter.setPen(QColor(255, 255, 255))
-        painter.setFont(QFont(self.digital_font_family, 10, QFont.Bold | QFont.StyleItalic))
-        kmph_text = "kmph"
-        kmph_width = painter.fontMetrics().width(kmph_text)
-        painter.drawText(int((self.width() - kmph_width) / 2), int(digital_speed_position_y + 30), kmph_text)
+    def draw_telltales(self, painter):
+        painter.setFont(self.text_cache.font(self.font_telltale))
+        for bit, caption, color, rect in TELLTALES:
+            if self.icon_status & (1 << bit):
+                painter.setPen(QPen(color, 2))
+                painter.setBrush(Qt.NoBrush)
+                painter.drawRoundedRect(rect, 6, 6)
+                painter.drawText(rect, Qt.AlignCenter, caption)
  
     def update_values(self, new_speed, new_rpm, fuel_level):
         self.speed = new_speed
         self.rpm = new_rpm
         self.fuel_level = fuel_level
-        self.update()
+        self.state_changed()
  
     def get_initial_input(self):
         while True:
@@ -409,11 +815,68 @@ class InstrumentCluster(QWidget):
             except ValueError:
                 print("Invalid input. Please enter integer values.")
  
+def create_ingest_server(host, port, ingest_process, verbose):
+    # Binds the listener without delivering anything yet, so producers can connect
+    # while the GUI is still being built; InstrumentCluster.attach_ingest_server()
+    # starts delivery. Either way a port that can't be bound raises OSError here.
+    if ingest_process:
+        server = IngestProcess(REGISTER_MAP, host, port, verbose=verbose)
+        server.wait_ready()
+        return server
+    return IngestServer(host, port)
+ 
 def main():
-    app = QApplication(sys.argv)
-    cluster = InstrumentCluster()
+    startup = StartupProfile(STARTED)
+    startup.mark("imports")
+    parser = argparse.ArgumentParser(description="Modern Instrument Cluster")
+    parser.add_argument("--port", type=int, default=8080, help="port the ingestion server listens on")
+    parser.add_argument("--record", metavar="PATH", help="append every accepted update to a telemetry log")
+    parser.add_argument("--replay", metavar="PATH", help="replay a telemetry log instead of listening on a socket")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="replay speed multiplier, 0 for as fast as possible")
+    parser.add_argument("--quiet", action="store_true", help="don't print every register change")
+    parser.add_argument("--fps", type=int, default=TARGET_FPS, help="target animation frame rate")
+    parser.add_argument("--stats-port", type=int, metavar="PORT", help="serve live metrics on http://localhost:PORT/metrics")
+    parser.add_argument("--ingest-process", action="store_true",
+                        help="accept, decode and validate input in a worker process instead of a thread")
+    parser.add_argument("--precise-needles", action="store_true",
+                        help="draw needles as antialiased vectors at their exact angle instead of pre-rendered sprites")
+    parser.add_argument("--shm", nargs="?", const=SHM_DEFAULT_NAME, metavar="NAME",
+                        help=f"also accept registers from same-host producers through shared memory (default name {SHM_DEFAULT_NAME})")
+    args, qt_args = parser.parse_known_args()
+ 
+    ingest_server = None
+    if not args.replay:
+        ingest_server = create_ingest_server("localhost", args.port, args.ingest_process, not args.quiet)
+        startup.mark("listener bound")
+    app = QApplication(sys.argv[:1] + qt_args)
+    startup.mark("QApplication")
+    recorder = TelemetryRecorder(args.record) if args.record else None
+    shared_bank = SharedRegisterBank(args.shm) if args.shm else None
+    cluster = InstrumentCluster(port=None, recorder=recorder, verbose=not args.quiet, target_fps=args.fps, shared_bank=shared_bank,
+                                precise_needles=args.precise_needles, ingest_server=ingest_server, startup=startup)
+    startup.mark("widget built")
     cluster.show()
-    sys.exit(app.exec_())
+    startup.mark("shown")
+ 
+    if args.stats_port is not None:
+        stats_server = StatsServer(cluster.collect_metrics, port=args.stats_port)
+        stats_server.start()
+        print(f"Metrics available at http://localhost:{stats_server.port}/metrics")
+    if args.replay:
+        replay = TelemetryReplay(args.replay)
+        print(f"Replaying {replay.count} updates from {args.replay}...")
+        threading.Thread(target=replay.play, args=(cluster.ingest_updates, args.replay_speed), daemon=True).start()
+    if shared_bank is not None:
+        print(f"Reading registers from shared memory block {shared_bank.name!r}")
+        app.aboutToQuit.connect(shared_bank.close)
+    if isinstance(cluster.ingest_server, IngestProcess):
+        app.aboutToQuit.connect(cluster.ingest_server.stop)
+    if recorder is not None:
+        app.aboutToQuit.connect(recorder.close)
+    status = app.exec_()
+    if cluster.latency.histograms["total"].count:
+        print(cluster.latency.report())
+    sys.exit(status)
  
 if __name__ == "__main__":
     main()
@@ -0,0 +1,240 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class RollingHistogram:
+    # Keeps the most recent `size` samples so percentiles reflect current behaviour
+    def __init__(self, size=4096):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        if not self.samples:
+            return {"count": self.count, "p50": None, "p99": None, "max": None}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {
+            "count": self.count,
+            "p50": ordered[int(0.50 * last)],
+            "p99": ordered[int(0.99 * last)],
+            "max": ordered[-1],
+        }
+
+
+class RateCounter:
+    # Per-key event counters (bumped on the hot path by a single writer) with
+    # per-second rates computed lazily from the change since the previous sample
+    def __init__(self, interval=1.0):
+        self.counts = {}
+        self.interval = interval
+        self._rates = {}
+        self._sample_time = time.monotonic()
+        self._sample_counts = {}
+        self._lock = threading.Lock()
+
+    def rates(self):
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._sample_time
+            if elapsed >= self.interval:
+                counts = self.counts.copy()
+                previous = self._sample_counts
+                self._rates = {key: (count - previous.get(key, 0)) / elapsed for key, count in counts.items()}
+                self._sample_time = now
+                self._sample_counts = counts
+            return dict(self._rates)
+
+
+class PaintStats:
+    # Frames rendered and how long paintEvent took
+    def __init__(self):
+        self.frames = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def add(self, seconds):
+        self.frames += 1
+        self.total_time += seconds
+        if seconds > self.max_time:
+            self.max_time = seconds
+
+    def summary(self):
+        return {
+            "frames_rendered": self.frames,
+            "paint_ms_avg": self.total_time / self.frames * 1000 if self.frames else None,
+            "paint_ms_max": self.max_time * 1000,
+        }
+
+
+class StartupProfile:
+    # Time spent in each startup phase, from `start` (a time.perf_counter() taken
+    # as early as possible) through to the first painted frame and beyond
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last, now - self.start))
+        self.last = now
+
+    def summary(self):
+        return {name: round(elapsed * 1000, 2) for name, elapsed, _ in self.phases}
+
+    def report(self):
+        lines = [f"{'startup phase':<20} {'ms':>8} {'since start':>12}"]
+        for name, elapsed, total in self.phases:
+            lines.append(f"{name:<20} {elapsed * 1000:>8.1f} {total * 1000:>12.1f}")
+        return "\n".join(lines)
+
+
+class LatencyTracer:
+    # Follows traced frames from the producer's send through receive, decode,
+    # delivery to the GUI thread and the completion of the paint that shows them.
+    # All timestamps are time.time_ns() so they are comparable with the producer's.
+    STAGES = ("network", "decode", "delivery", "paint", "total")
+
+    def __init__(self, window=4096):
+        self.window = window
+        self.histograms = {stage: RollingHistogram(window) for stage in self.STAGES}
+        self.by_address = {}
+        self.sequence_gaps = 0
+        self.out_of_order = 0
+        self._lock = threading.Lock()
+        self._decoded = []
+        self._delivered = []
+
+    def frame_received(self, previous_seq, seq, sent_ns, recv_ns, decode_ns, addresses):
+        # Ingestion thread. Returns seq so the caller can remember it per connection.
+        if previous_seq is not None:
+            expected = (previous_seq + 1) & 0xFFFFFFFF
+            missing = (seq - expected) & 0xFFFFFFFF
+            if missing >= 0x80000000:
+                self.out_of_order += 1
+            else:
+                self.sequence_gaps += missing
+        with self._lock:
+            self._decoded.append((sent_ns, recv_ns, decode_ns, addresses))
+            if len(self._decoded) > self.window:
+                del self._decoded[:-self.window]
+        return seq
+
+    def delivered(self, now_ns):
+        # GUI thread: the snapshot holding these frames' values has just been applied
+        with self._lock:
+            decoded = self._decoded
+            self._decoded = []
+        self._delivered.extend((trace, now_ns) for trace in decoded)
+        # Nothing is painting (e.g. the window is hidden); keep only the newest traces
+        if len(self._delivered) > self.window:
+            del self._delivered[:-self.window]
+
+    def painted(self, now_ns):
+        # GUI thread: a paint that includes every delivered frame has completed
+        if not self._delivered:
+            return
+        histograms = self.histograms
+        for (sent_ns, recv_ns, decode_ns, addresses), delivered_ns in self._delivered:
+            histograms["network"].add((recv_ns - sent_ns) / 1e6)
+            histograms["decode"].add((decode_ns - recv_ns) / 1e6)
+            histograms["delivery"].add((delivered_ns - decode_ns) / 1e6)
+            histograms["paint"].add((now_ns - delivered_ns) / 1e6)
+            total = (now_ns - sent_ns) / 1e6
+            histograms["total"].add(total)
+            for address in addresses:
+                histogram = self.by_address.get(address)
+                if histogram is None:
+                    histogram = self.by_address[address] = RollingHistogram(self.window)
+                histogram.add(total)
+        self._delivered = []
+
+    def summary(self):
+        return {
+            "stages_ms": {stage: histogram.summary() for stage, histogram in self.histograms.items()},
+            "total_by_address_ms": {f"{address:#04x}": histogram.summary() for address, histogram in sorted(self.by_address.items())},
+            "sequence_gaps": self.sequence_gaps,
+            "out_of_order": self.out_of_order,
+        }
+
+    def report(self):
+        lines = [f"{'stage':<10} {'count':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        rows = [(stage, histogram) for stage, histogram in self.histograms.items()]
+        rows += [(f"addr {address:#04x}", histogram) for address, histogram in sorted(self.by_address.items())]
+        for name, histogram in rows:
+            stats = histogram.summary()
+            if stats["max"] is None:
+                continue
+            lines.append(f"{name:<10} {stats['count']:>8} {stats['p50']:>9.2f} {stats['p99']:>9.2f} {stats['max']:>9.2f}")
+        lines.append(f"sequence gaps {self.sequence_gaps}, out of order {self.out_of_order}")
+        return "\n".join(lines)
+
+
+def format_text(metrics, prefix="cluster"):
+    # Flattens nested metrics into "name value" lines; tables keyed by register
+    # address ("0x01") become an address label instead of part of the name
+    lines = []
+
+    def walk(name, value, labels):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key.startswith("0x"):
+                    walk(name, item, f'{{address="{key}"}}')
+                else:
+                    walk(f"{name}_{key}", item, labels)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"{name}{labels} {value:g}" if isinstance(value, float) else f"{name}{labels} {value}")
+
+    walk(prefix, metrics, "")
+    return "\n".join(lines) + "\n"
+
+
+class StatsServer:
+    # Serves a live metrics snapshot over HTTP on localhost so a running cluster
+    # can be inspected without a debugger: GET /metrics for "name value" text,
+    # GET /metrics.json for the nested JSON. `collect` is called per request on
+    # the server's own thread and must only read counters.
+    def __init__(self, collect, host="localhost", port=8081):
+        self.collect = collect
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path in ("/", "/metrics"):
+                    body = format_text(server.collect()).encode()
+                    content_type = "text/plain; version=0.0.4"
+                elif path == "/metrics.json":
+                    body = json.dumps(server.collect(), indent=2).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
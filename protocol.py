@@ -0,0 +1,159 @@
+import struct
+
+# Legacy ASCII messages are "AAAAAAAA DDDDDDDD": 8 hex digits of address, a space
+# and 8 hex digits of data, with no delimiter between consecutive messages.
+ASCII_RECORD_SIZE = 17
+ASCII_WHITESPACE = b" \t\r\n"
+
+# Binary frames start with a byte that never appears in the ASCII protocol,
+# so both encodings can share one connection.
+FRAME_MAGIC = 0xA5
+FRAME_HEADER = struct.Struct("<BBH")  # magic, flags, number of records
+RECORD = struct.Struct("<HI")  # address, value
+MAX_RECORDS = 0xFFFF
+
+# Frame flags
+FLAG_ACK_REQUEST = 0x01  # The producer wants the server to acknowledge this frame
+FLAG_ACK = 0x02  # Server -> producer: one ACK_ADDRESS record carrying the number of updates accepted
+FLAG_TRACE = 0x04  # The header is followed by a TRACE block for latency tracing
+FLAG_KEYFRAME = 0x08  # The records are the producer's full state: every register it drives
+FLAG_DELTA = 0x10  # Only registers that changed since the previous frame; needs an earlier keyframe
+FLAG_VEHICLE = 0x20  # The header (and TRACE block) is followed by a VEHICLE block naming the target vehicle
+ACK_ADDRESS = 0xFFFF
+TRACE = struct.Struct("<IQ")  # sequence number, send time in ns since the epoch
+VEHICLE = struct.Struct("<H")  # vehicle ID, for processes that host several clusters
+
+# Register addresses shared by producers and the cluster
+ADDR_CAR_STATUS = 0x00
+ADDR_SPEED = 0x01
+ADDR_RPM = 0x02
+ADDR_FUEL = 0x03
+ADDR_ICONS = 0x04
+ADDR_TEMPERATURE = 0x05
+REGISTER_ADDRESSES = {
+    "car_status": ADDR_CAR_STATUS,
+    "speed": ADDR_SPEED,
+    "rpm": ADDR_RPM,
+    "fuel_level": ADDR_FUEL,
+    "icon_status": ADDR_ICONS,
+    "temperature": ADDR_TEMPERATURE,
+}
+# Temperatures travel as degrees Celsius plus this offset, so sub-zero values fit an unsigned register
+TEMPERATURE_OFFSET = 40
+
+
+class Frame:
+    # One decoded message: a batch of (address, value) updates, plus the
+    # sequence number and send time when the producer traces it, and the
+    # vehicle it is addressed to when it names one
+    __slots__ = ("flags", "updates", "seq", "sent_ns", "vehicle")
+
+    def __init__(self, flags, updates, seq=None, sent_ns=None, vehicle=None):
+        self.flags = flags
+        self.updates = updates
+        self.seq = seq
+        self.sent_ns = sent_ns
+        self.vehicle = vehicle
+
+    def __repr__(self):
+        return f"Frame(flags={self.flags:#04x}, updates={self.updates!r})"
+
+
+def encode_ascii(address, value):
+    return f"{address:08X} {value:08X}".encode()
+
+
+def encode_frame(updates, flags=0, seq=None, sent_ns=None, vehicle=None):
+    # Pack a batch of (address, value) pairs behind a single length header
+    updates = list(updates)
+    if len(updates) > MAX_RECORDS:
+        raise ValueError(f"A frame can carry at most {MAX_RECORDS} records")
+    if seq is not None:
+        flags |= FLAG_TRACE
+    if vehicle is not None:
+        flags |= FLAG_VEHICLE
+    parts = [FRAME_HEADER.pack(FRAME_MAGIC, flags, len(updates))]
+    if seq is not None:
+        parts.append(TRACE.pack(seq & 0xFFFFFFFF, sent_ns))
+    if vehicle is not None:
+        parts.append(VEHICLE.pack(vehicle))
+    parts.extend(RECORD.pack(address, value) for address, value in updates)
+    return b"".join(parts)
+
+
+def encode_ack(count):
+    return encode_frame([(ACK_ADDRESS, count)], FLAG_ACK)
+
+
+class FrameDecoder:
+    # Incremental decoder for a byte stream of binary frames and/or legacy ASCII
+    # messages. Partial frames are kept until the rest arrives.
+    def __init__(self):
+        self.buffer = bytearray()
+        self.errors = 0
+
+    def feed(self, data):
+        buffer = self.buffer
+        buffer += data
+        frames = []
+        pos = 0
+        end = len(buffer)
+        with memoryview(buffer) as view:
+            while pos < end:
+                byte = buffer[pos]
+                if byte == FRAME_MAGIC:
+                    if end - pos < FRAME_HEADER.size:
+                        break
+                    _, flags, count = FRAME_HEADER.unpack_from(buffer, pos)
+                    start = pos + FRAME_HEADER.size
+                    if flags & FLAG_TRACE:
+                        start += TRACE.size
+                    if flags & FLAG_VEHICLE:
+                        start += VEHICLE.size
+                    frame_end = start + count * RECORD.size
+                    if frame_end > end:
+                        break
+                    frame = Frame(flags, list(RECORD.iter_unpack(view[start:frame_end])))
+                    if flags & FLAG_TRACE:
+                        frame.seq, frame.sent_ns = TRACE.unpack_from(buffer, pos + FRAME_HEADER.size)
+                    if flags & FLAG_VEHICLE:
+                        frame.vehicle = VEHICLE.unpack_from(buffer, start - VEHICLE.size)[0]
+                    frames.append(frame)
+                    pos = frame_end
+                elif byte in ASCII_WHITESPACE:
+                    pos += 1
+                else:
+                    if end - pos < ASCII_RECORD_SIZE:
+                        break
+                    update = self._decode_ascii(buffer, pos)
+                    if update is None:
+                        self.errors += 1
+                        if buffer[pos + 8] == 0x20:
+                            # Shaped like a message but not hex: drop just that message, so
+                            # its data field isn't taken for the next message's address
+                            pos += ASCII_RECORD_SIZE
+                        else:
+                            pos = self._resync(buffer, pos + 1, end)
+                        continue
+                    frames.append(Frame(0, [update]))
+                    pos += ASCII_RECORD_SIZE
+        del buffer[:pos]
+        return frames
+
+    @staticmethod
+    def _decode_ascii(buffer, pos):
+        if buffer[pos + 8] != 0x20:
+            return None
+        try:
+            address = int(buffer[pos:pos + 8], 16)
+            value = int(buffer[pos + 9:pos + ASCII_RECORD_SIZE], 16)
+        except ValueError:
+            return None
+        return address, value
+
+    @staticmethod
+    def _resync(buffer, pos, end):
+        # Skip garbage up to the next message boundary we can recognise
+        while pos < end and buffer[pos] not in ASCII_WHITESPACE and buffer[pos] != FRAME_MAGIC:
+            pos += 1
+        return pos
@@ -0,0 +1,72 @@
+class Register:
+    # Declarative description of one addressable signal: the accepted raw range
+    # and how a raw value decodes into what the cluster displays
+    __slots__ = ("address", "name", "label", "minimum", "maximum", "decode")
+
+    def __init__(self, address, name, label, minimum=0, maximum=0xFFFFFFFF, decode=None):
+        self.address = address
+        self.name = name
+        self.label = label
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decode = decode
+
+    def __repr__(self):
+        return f"Register({self.address:#04x}, {self.name!r})"
+
+
+class RegisterBank:
+    # Register bank indexed by address: registers, decoded values and callbacks
+    # are lists indexed by address, so dispatching a write is a list lookup and
+    # adding a signal means adding a Register, not a parser branch.
+    # Change callbacks are called as callback(register, value) only when the
+    # decoded value actually changes.
+    def __init__(self, registers):
+        size = max(register.address for register in registers) + 1
+        self.registers = [None] * size
+        self.values = [None] * size
+        self.callbacks = [[] for _ in range(size)]
+        self.names = {}
+        self.on_reject = None
+        self.rejected = 0
+        self.rejected_by_address = [0] * size
+        self.unknown = 0
+        for register in registers:
+            if self.registers[register.address] is not None:
+                raise ValueError(f"Duplicate register address {register.address:#04x}")
+            self.registers[register.address] = register
+            self.names[register.name] = register
+
+    def on_change(self, callback, name=None):
+        # Subscribe to one register by name, or to every register when name is None
+        if name is None:
+            for callbacks, register in zip(self.callbacks, self.registers):
+                if register is not None:
+                    callbacks.append(callback)
+        else:
+            self.callbacks[self.names[name].address].append(callback)
+
+    def write(self, address, raw):
+        register = self.registers[address] if 0 <= address < len(self.registers) else None
+        if register is None:
+            self.unknown += 1
+            return False
+        if not register.minimum <= raw <= register.maximum:
+            self.rejected += 1
+            self.rejected_by_address[address] += 1
+            if self.on_reject is not None:
+                self.on_reject(register, raw)
+            return False
+
+        value = register.decode(raw) if register.decode is not None else raw
+        if value != self.values[address]:
+            self.values[address] = value
+            for callback in self.callbacks[address]:
+                callback(register, value)
+        return True
+
+    def write_named(self, name, raw):
+        return self.write(self.names[name].address, raw)
+
+    def value(self, name):
+        return self.values[self.names[name].address]
@@ -0,0 +1,266 @@
+import math
+from collections import OrderedDict
+from fractions import Fraction
+
+from PyQt5.QtCore import QPointF, QRect, Qt
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QFontMetricsF, QPainter, QPen, QPixmap, QStaticText, QTransform
+
+
+def paint_pixmap(width, height, device_pixel_ratio, paint):
+    # Transparent pixmap covering width x height logical px, painted by paint(painter)
+    # in logical coordinates. Qt only scales the painter by itself for ratios above
+    # 1, so the scale is applied here and the ratio set once painting is done; that
+    # also serves the scaled-down views of a dashboard wall.
+    pixmap = QPixmap(int(width * device_pixel_ratio), int(height * device_pixel_ratio))
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    if device_pixel_ratio != 1.0:
+        painter.scale(device_pixel_ratio, device_pixel_ratio)
+    paint(painter)
+    painter.end()
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    return pixmap
+
+
+class LayerCache:
+    # Static layers rendered once into pixmaps and reused every frame until
+    # invalidate() is called (resize, theme change) or the target size changes
+    def __init__(self):
+        self.layers = {}
+        self.builds = 0
+
+    def get(self, name, size, device_pixel_ratio, paint):
+        key = (size.width(), size.height(), device_pixel_ratio)
+        entry = self.layers.get(name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        pixmap = paint_pixmap(size.width(), size.height(), device_pixel_ratio, paint)
+        self.layers[name] = (key, pixmap)
+        self.builds += 1
+        return pixmap
+
+    def invalidate(self, name=None):
+        if name is None:
+            self.layers.clear()
+        else:
+            self.layers.pop(name, None)
+
+
+class TextCache:
+    # Fonts, metrics and laid-out strings reused across frames. Fonts are named by
+    # a (family, point size, weight, italic) spec and built once. Strings are kept
+    # as prepared QStaticText, so glyph layout runs once per distinct (spec, text)
+    # instead of on every draw; the least recently used are dropped beyond `limit`.
+    def __init__(self, limit=1024):
+        self.limit = limit
+        self.fonts = {}
+        self.ascents = {}
+        self.widths = {}
+        self.texts = OrderedDict()
+        self.layouts = 0
+
+    def font(self, spec):
+        font = self.fonts.get(spec)
+        if font is None:
+            family, size, weight, italic = spec
+            font = self.fonts[spec] = QFont(family, size, weight, italic)
+            self.ascents[spec] = QFontMetricsF(font).ascent()
+        return font
+
+    def width(self, spec, text):
+        key = (spec, text)
+        width = self.widths.get(key)
+        if width is None:
+            if len(self.widths) >= self.limit:
+                self.widths.clear()
+            width = self.widths[key] = QFontMetrics(self.font(spec)).width(text)
+        return width
+
+    def static_text(self, spec, text):
+        key = (spec, text)
+        static = self.texts.get(key)
+        if static is not None:
+            self.texts.move_to_end(key)
+            return static
+        static = QStaticText(text)
+        static.setTextFormat(Qt.PlainText)
+        static.setPerformanceHint(QStaticText.AggressiveCaching)
+        static.prepare(QTransform(), self.font(spec))
+        self.texts[key] = static
+        self.layouts += 1
+        if len(self.texts) > self.limit:
+            self.texts.popitem(last=False)
+        return static
+
+    def draw(self, painter, spec, x, y, text):
+        # Same placement as painter.drawText(x, y, text): (x, y) is the baseline start
+        static = self.static_text(spec, text)
+        painter.setFont(self.fonts[spec])
+        painter.drawStaticText(QPointF(x, y - self.ascents[spec]), static)
+
+    def draw_centered(self, painter, spec, center_x, y, text):
+        self.draw(painter, spec, int(center_x - self.width(spec, text) / 2), y, text)
+
+
+class NeedleAtlas:
+    # Needles pre-rasterized at fixed angular steps and blitted, instead of
+    # antialiased vector strokes rotated every frame. Sprites are built lazily the
+    # first time an angle is shown, keyed by the caller's shape key (length,
+    # colour state), the quantized angle and the device pixel ratio. A 0.5 degree
+    # step moves the tip of a 190 px needle by at most 0.83 px.
+    #
+    # Memory budget: the cluster's needles (190 px gauge needles over 240 degrees
+    # and a 116 px fuel needle over 210 degrees, two colour states each) come to
+    # about 900 sprites per device pixel ratio. A diagonal needle covers only a
+    # few percent of its bounding box, so each sprite is kept as horizontal bands
+    # cropped to the needle, which keeps the whole set within a 12 MiB budget at
+    # ratio 1 (32 MiB as whole boxes). `limit` holds that set for two ratios, so a
+    # sweep never evicts sprites it is about to need again.
+    def __init__(self, step=0.5, limit=2048, band_height=24):
+        self.step = step
+        self.limit = limit
+        self.band_height = band_height  # Device px per band before neighbours are merged
+        self.sprites = OrderedDict()
+        self.builds = 0
+        self.bytes = 0
+
+    def draw(self, painter, x, y, angle, key, bounds, paint, device_pixel_ratio=1.0):
+        # bounds: QRectF around the unrotated needle, pivot at (0, 0), pointing up.
+        # paint(painter) draws the needle in that frame.
+        index = round(angle / self.step)
+        cache_key = (key, index, device_pixel_ratio)
+        sprite = self.sprites.get(cache_key)
+        if sprite is None:
+            sprite = self.sprites[cache_key] = self._build(index * self.step, bounds, paint, device_pixel_ratio)
+            self.bytes += sprite_bytes(sprite)
+            if len(self.sprites) > self.limit:
+                self.bytes -= sprite_bytes(self.sprites.popitem(last=False)[1])
+        else:
+            self.sprites.move_to_end(cache_key)
+        for origin_x, origin_y, pixmap in sprite:
+            painter.drawPixmap(x + origin_x, y + origin_y, pixmap)
+
+    def _build(self, angle, bounds, paint, device_pixel_ratio):
+        # The sprite covers the rotated bounds rounded out to whole pixels, so the
+        # pivot lands on the same pixel grid as a vector draw at (x, y) would
+        transform = QTransform().rotate(angle)
+        rotated = transform.mapRect(bounds)
+        left, top = math.floor(rotated.left()), math.floor(rotated.top())
+        width, height = math.ceil(rotated.right()) - left, math.ceil(rotated.bottom()) - top
+
+        def paint_rotated(painter):
+            painter.translate(-left, -top)
+            painter.rotate(angle)
+            paint(painter)
+
+        pixmap = paint_pixmap(width, height, device_pixel_ratio, paint_rotated)
+        self.builds += 1
+
+        # Cut it into bands of rows, each cropped to where the rotated bounds cross
+        # it (plus a pixel for antialiasing). Bands never overlap, so blitting them
+        # all gives exactly the uncropped sprite. Band edges stay on multiples of
+        # `unit` device px, which is a whole number of logical px even at ratios
+        # like 1.5, so each band lands on the same pixels as the whole sprite would.
+        ratio = Fraction(device_pixel_ratio).limit_denominator(64)
+        unit = ratio.numerator
+        band_height = max(unit, self.band_height - self.band_height % unit)
+        corners = [transform.map(corner) for corner in (bounds.topLeft(), bounds.topRight(), bounds.bottomRight(), bounds.bottomLeft())]
+        polygon = [((corner.x() - left) * device_pixel_ratio, (corner.y() - top) * device_pixel_ratio) for corner in corners]
+        pixel_width, pixel_height = pixmap.width(), pixmap.height()
+        bands = []
+        for band_top in range(0, pixel_height, band_height):
+            band_bottom = min(band_top + band_height, pixel_height)
+            extent = polygon_x_extent(polygon, band_top, band_bottom)
+            if extent is None:
+                continue
+            band_left = max(0, math.floor(extent[0]) - 1)
+            band_left -= band_left % unit
+            band_right = min(pixel_width, math.ceil(extent[1]) + 1)
+            if bands:
+                # Merge with the band above while that costs little extra memory,
+                # e.g. all the way down a vertical needle
+                last_left, last_top, last_right, last_bottom = bands[-1]
+                merged = (max(last_right, band_right) - min(last_left, band_left)) * (band_bottom - last_top)
+                separate = (last_right - last_left) * (last_bottom - last_top) + (band_right - band_left) * (band_bottom - band_top)
+                if merged <= separate * 1.25:
+                    bands[-1] = [min(last_left, band_left), last_top, max(last_right, band_right), band_bottom]
+                    continue
+            bands.append([band_left, band_top, band_right, band_bottom])
+
+        sprite = []
+        for band_left, band_top, band_right, band_bottom in bands:
+            piece = pixmap.copy(QRect(band_left, band_top, band_right - band_left, band_bottom - band_top))
+            piece.setDevicePixelRatio(device_pixel_ratio)
+            sprite.append((left + band_left // unit * ratio.denominator, top + band_top // unit * ratio.denominator, piece))
+        return sprite
+
+    def invalidate(self):
+        self.sprites.clear()
+        self.bytes = 0
+
+
+def sprite_bytes(sprite):
+    return sum(pixmap.width() * pixmap.height() * 4 for _, _, pixmap in sprite)
+
+
+def polygon_x_extent(polygon, top, bottom):
+    # Horizontal extent of a convex polygon between two rows, or None if it
+    # doesn't reach them: its vertices in the slab plus where its edges cross
+    # the slab's top and bottom
+    xs = [x for x, y in polygon if top <= y <= bottom]
+    for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+        for row in (top, bottom):
+            if min(y1, y2) <= row <= max(y1, y2) and y1 != y2:
+                xs.append(x1 + (x2 - x1) * (row - y1) / (y2 - y1))
+    if not xs:
+        return None
+    return min(xs), max(xs)
+
+
+class RoadRenderer:
+    # Lane dashes pre-rendered once into a strip one dash period taller than the
+    # road, then scrolled by blitting the strip at the current offset: one
+    # clipped drawPixmap per frame instead of a drawLine per dash
+    def __init__(self, spacing=20, dash_length=3, pen_width=5, color=QColor(255, 255, 255)):
+        self.spacing = spacing
+        self.dash_length = dash_length
+        self.pen_width = pen_width
+        self.color = color
+        self.margin = pen_width  # Room for the square caps around each dash
+        self.width = pen_width + 2 * self.margin
+        self.center = self.width // 2
+        self.key = None
+        self.strip = None
+        self.builds = 0
+
+    def draw(self, painter, lane_x, top, bottom, offset, device_pixel_ratio=1.0):
+        # Dashes start at top + offset and repeat every `spacing` px down to bottom;
+        # offset is expected in [0, spacing)
+        key = (bottom - top, device_pixel_ratio)
+        if key != self.key:
+            self.strip = self._build(bottom - top, device_pixel_ratio)
+            self.key = key
+        left = lane_x - self.center
+        painter.save()
+        painter.setClipRect(QRect(left, top, self.width, bottom - top))
+        painter.drawPixmap(left, top + int(offset) - self.spacing - self.margin, self.strip)
+        painter.restore()
+
+    def _build(self, length, device_pixel_ratio):
+        width = self.width
+        height = length + self.spacing + 2 * self.margin
+
+        def paint_dashes(painter):
+            painter.setPen(QPen(self.color, self.pen_width))
+            center = self.center
+            for y in range(self.margin, height - self.margin, self.spacing):
+                painter.drawLine(center, y, center, y + self.dash_length)
+
+        strip = paint_pixmap(width, height, device_pixel_ratio, paint_dashes)
+        self.builds += 1
+        return strip
+
+    def invalidate(self):
+        self.key = None
@@ -0,0 +1,153 @@
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+# Register bank in a shared memory block for producers on the same host as the
+# cluster. Producers store raw register values straight into the block; the
+# cluster reads it once per frame. Layout:
+#   header  magic, version, slot count
+#   seq     seqlock counter, odd while a write is in progress
+#   written bitmask of the slots that have ever been written
+#   slots   one raw uint32 per register address
+#   stamps  one uint64 per slot: the producer's running write count at the
+#           slot's latest write, so a value written again is still seen as a
+#           write, and writes can be put back in the order they happened
+SHM_MAGIC = b"ICSM"
+SHM_VERSION = 2
+SHM_HEADER = struct.Struct("<4sHH")
+SHM_SEQ = struct.Struct("<Q")
+SHM_WRITTEN = struct.Struct("<Q")
+SEQ_OFFSET = SHM_HEADER.size
+WRITTEN_OFFSET = SEQ_OFFSET + SHM_SEQ.size
+SLOTS_OFFSET = WRITTEN_OFFSET + SHM_WRITTEN.size
+DEFAULT_SLOTS = 16
+DEFAULT_NAME = "instrument_cluster"
+READ_ATTEMPTS = 100
+
+
+def attach(name):
+    # Opens an existing block without letting this process's resource tracker
+    # unlink it at exit; the cluster that created it owns its lifetime
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    magic, version, slots = SHM_HEADER.unpack_from(shm.buf, 0)
+    if magic != SHM_MAGIC:
+        shm.close()
+        raise ValueError(f"Shared memory block {name!r} is not a register bank")
+    if version != SHM_VERSION:
+        shm.close()
+        raise ValueError(f"Shared memory block {name!r} has unsupported version {version}")
+    return shm, slots
+
+
+class SharedRegisterBank:
+    # Reader side, owned by the cluster: creates the block and unlinks it on close.
+    # read() returns the (address, value) pairs written since the previous read,
+    # in the order they were last written, or an empty list when the sequence
+    # counter hasn't moved. Every write is forwarded, not just changes: the
+    # cluster's own bank may have diverged (switching the car off zeroes speed).
+    def __init__(self, name=DEFAULT_NAME, slots=DEFAULT_SLOTS):
+        if not 0 < slots <= 64:
+            raise ValueError("A shared register bank holds between 1 and 64 slots")
+        self.slots = slots
+        self.values = struct.Struct(f"<{slots}I")
+        self.stamps = struct.Struct(f"<{slots}Q")
+        self.stamps_offset = SLOTS_OFFSET + self.values.size
+        size = self.stamps_offset + self.stamps.size
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a cluster that didn't shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        SHM_HEADER.pack_into(self.shm.buf, 0, SHM_MAGIC, SHM_VERSION, slots)
+        self.last_seq = 0
+        self.last_stamps = [0] * slots
+        self.reads = 0
+        self.retries = 0
+
+    def read(self):
+        buf = self.shm.buf
+        for _ in range(READ_ATTEMPTS):
+            seq = SHM_SEQ.unpack_from(buf, SEQ_OFFSET)[0]
+            if seq == self.last_seq:
+                return []
+            if seq & 1:
+                # A writer is mid-update; it only holds the lock for a few stores
+                self.retries += 1
+                continue
+            written = SHM_WRITTEN.unpack_from(buf, WRITTEN_OFFSET)[0]
+            values = self.values.unpack_from(buf, SLOTS_OFFSET)
+            stamps = self.stamps.unpack_from(buf, self.stamps_offset)
+            if SHM_SEQ.unpack_from(buf, SEQ_OFFSET)[0] == seq:
+                break
+            self.retries += 1
+        else:
+            # Still inconsistent (or a writer died mid-update); try again next frame
+            return []
+        self.last_seq = seq
+        self.reads += 1
+        changed = []
+        last_stamps = self.last_stamps
+        for address, stamp in enumerate(stamps):
+            if written >> address & 1 and stamp != last_stamps[address]:
+                last_stamps[address] = stamp
+                changed.append((stamp, address, values[address]))
+        changed.sort()
+        return [(address, value) for _, address, value in changed]
+
+    def close(self):
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedRegisterWriter:
+    # Producer side. Writes are bracketed by the seqlock, so the cluster never sees
+    # half of a batch; there must be only one writer at a time per block.
+    # Python can't emit memory fences, so this relies on the CPU making the
+    # stores visible in program order, as x86 does
+    def __init__(self, name=DEFAULT_NAME):
+        self.name = name
+        self.shm, self.slots = attach(name)
+        self.stamps_offset = SLOTS_OFFSET + 4 * self.slots
+        self.seq = SHM_SEQ.unpack_from(self.shm.buf, SEQ_OFFSET)[0] & ~1
+        self.written = SHM_WRITTEN.unpack_from(self.shm.buf, WRITTEN_OFFSET)[0]
+        # Carry on from an earlier producer's write count, so stamps keep increasing
+        self.stamp = max(struct.unpack_from(f"<{self.slots}Q", self.shm.buf, self.stamps_offset))
+        self.updates_written = 0
+
+    def write_many(self, updates):
+        buf = self.shm.buf
+        written = self.written
+        stamp = self.stamp
+        self.seq += 1
+        SHM_SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+        count = 0
+        try:
+            for address, value in updates:
+                if not 0 <= address < self.slots:
+                    raise ValueError(f"Address {address:#04x} is outside the shared register bank")
+                struct.pack_into("<I", buf, SLOTS_OFFSET + 4 * address, value)
+                stamp += 1
+                struct.pack_into("<Q", buf, self.stamps_offset + 8 * address, stamp)
+                written |= 1 << address
+                count += 1
+        finally:
+            SHM_WRITTEN.pack_into(buf, WRITTEN_OFFSET, written)
+            self.written = written
+            self.stamp = stamp
+            self.seq += 1
+            SHM_SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+        self.updates_written += count
+        return count
+
+    def write(self, address, value):
+        self.write_many([(address, value)])
+
+    def close(self):
+        self.shm.close()
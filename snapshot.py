@@ -0,0 +1,56 @@
+import threading
+
+
+class StateSnapshot:
+    # Latest-value mailbox between the ingestion thread and the GUI thread.
+    # The ingestion thread writes named values; the GUI thread takes all
+    # pending values at once. A value written again before it was taken
+    # replaces the pending one, so bursts between frames are coalesced.
+    def __init__(self, notify=None):
+        self.notify = notify
+        self.received = 0
+        self.applied = 0
+        self.superseded = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._notified = False
+
+    def write(self, name, value):
+        with self._lock:
+            pending = self._pending
+            if name in pending:
+                self.superseded += 1
+            pending[name] = value
+            self.received += 1
+            notify = not self._notified
+            self._notified = True
+        # Only the first write after a take() wakes the reader
+        if notify and self.notify is not None:
+            self.notify()
+
+    def wake(self):
+        # Ask the reader for a take() even though no value changed
+        with self._lock:
+            notify = not self._notified
+            self._notified = True
+        if notify and self.notify is not None:
+            self.notify()
+
+    def take(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._notified = False
+            self.applied += len(pending)
+        return pending
+
+    def counters(self):
+        with self._lock:
+            return {
+                "received": self.received,
+                "applied": self.applied,
+                "superseded": self.superseded,
+                "pending": len(self._pending),
+                # Cross-thread wakeups posted but not yet taken; coalescing keeps this at 0 or 1
+                "queued_events": int(self._notified),
+            }
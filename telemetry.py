@@ -0,0 +1,127 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+# Log layout: an 8-byte header followed by fixed-size records
+LOG_MAGIC = b"ICTL"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<4sHH")  # magic, version, reserved
+LOG_RECORD = struct.Struct("<dHI")  # timestamp (seconds since the epoch), address, value
+
+
+class TelemetryRecorder:
+    # Appends every decoded (timestamp, address, value) update to a binary log.
+    # Updates recorded in one call share a timestamp, so replay keeps the batches.
+    def __init__(self, path):
+        self.path = path
+        self.records = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, "rb") as existing:
+                read_header(existing.read(LOG_HEADER.size), path)
+        self.file = open(path, "ab")
+        if not exists:
+            self.file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, 0))
+
+    def record(self, updates, timestamp=None):
+        # Called from the ingestion path, so a batch that can't be packed or
+        # written is counted and dropped rather than raised into the server
+        if timestamp is None:
+            timestamp = time.time()
+        pack = LOG_RECORD.pack
+        try:
+            data = b"".join([pack(timestamp, address, value) for address, value in updates])
+        except struct.error as error:
+            self._failed(error)
+            return
+        with self._lock:
+            if self.file.closed:
+                return
+            try:
+                self.file.write(data)
+            except OSError as error:
+                self._failed(error)
+                return
+            self.records += len(data) // LOG_RECORD.size
+
+    def _failed(self, error):
+        self.failures += 1
+        if self.failures == 1:
+            print(f"Telemetry recording to {self.path} failed, dropping the batch: {error}")
+
+    def flush(self):
+        with self._lock:
+            if not self.file.closed:
+                self.file.flush()
+
+    def close(self):
+        with self._lock:
+            self.file.close()
+
+
+class TelemetryReplay:
+    # Memory-maps a telemetry log and feeds it back through an ingestion callback
+    # taking a list of (address, value) updates, without going through a socket
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        if size < LOG_HEADER.size:
+            self.file.close()
+            raise ValueError(f"{path} is not a telemetry log")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        read_header(self.mmap[:LOG_HEADER.size], path)
+        # A trailing partial record (e.g. from a crash mid-write) is ignored
+        self.count = (size - LOG_HEADER.size) // LOG_RECORD.size
+
+    def records(self):
+        end = LOG_HEADER.size + self.count * LOG_RECORD.size
+        return LOG_RECORD.iter_unpack(memoryview(self.mmap)[LOG_HEADER.size:end])
+
+    def play(self, sink, speed=1.0, stop_event=None):
+        # speed 1.0 replays in real time, N replays N times faster and 0 replays
+        # as fast as possible. Returns the number of updates fed to sink.
+        played = 0
+        batch = []
+        batch_time = None
+        first_time = None
+        start = time.perf_counter()
+        for timestamp, address, value in self.records():
+            if timestamp != batch_time and batch:
+                sink(batch)
+                played += len(batch)
+                batch = []
+                if stop_event is not None and stop_event.is_set():
+                    return played
+            if timestamp != batch_time:
+                batch_time = timestamp
+                if first_time is None:
+                    first_time = timestamp
+                if speed:
+                    delay = start + (timestamp - first_time) / speed - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+            batch.append((address, value))
+        if batch:
+            sink(batch)
+            played += len(batch)
+        return played
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+
+def read_header(data, path):
+    if len(data) < LOG_HEADER.size:
+        raise ValueError(f"{path} is not a telemetry log")
+    magic, version, _ = LOG_HEADER.unpack(data)
+    if magic != LOG_MAGIC:
+        raise ValueError(f"{path} is not a telemetry log")
+    if version != LOG_VERSION:
+        raise ValueError(f"{path} has unsupported telemetry log version {version}")
+    return version
@@ -0,0 +1,79 @@
+import time
+
+import animation
+from animation import IDLE_POLL_INTERVAL_MS, AnimationEngine, CriticallyDampedValue, FrameScheduler
+
+
+class FakeTimer:
+    def __init__(self):
+        self.active = False
+        self.period = 0
+
+    def start(self):
+        self.active = True
+
+    def stop(self):
+        self.active = False
+
+    def isActive(self):
+        return self.active
+
+    def setInterval(self, interval):
+        self.period = interval
+
+    def interval(self):
+        return self.period
+
+
+def test_critically_damped_step_is_exact_for_any_dt():
+    once = CriticallyDampedValue(0.0, omega=10.0, epsilon=0.0)
+    once.target = 100.0
+    once.step(0.1)
+    twice = CriticallyDampedValue(0.0, omega=10.0, epsilon=0.0)
+    twice.target = 100.0
+    twice.step(0.05)
+    twice.step(0.05)
+    assert abs(once.value - twice.value) < 1e-9
+    assert once.value < 100.0
+
+
+def test_scheduler_runs_frames_only_while_moving():
+    engine = AnimationEngine(60)
+    engine.add("speed")
+    timer = FakeTimer()
+    scheduler = FrameScheduler(timer, engine)
+    assert scheduler.wake(car_on=True, road_moving=False) == "idle"
+    assert not timer.isActive()
+    engine.set_target("speed", 50)
+    assert scheduler.wake(car_on=True, road_moving=False) == "moving"
+    assert timer.isActive()
+    # Switching off settles the needles instead of animating under the overlay
+    assert scheduler.wake(car_on=False, road_moving=False) == "off"
+    assert not timer.isActive()
+    assert engine.value("speed") == 50
+
+
+def test_poll_slows_down_when_idle_and_speeds_up_on_change(monkeypatch):
+    engine = AnimationEngine(60)
+    engine.add("speed")
+    poll = FakeTimer()
+    scheduler = FrameScheduler(FakeTimer(), engine)
+    scheduler.attach_poll(poll, 16)
+    assert poll.isActive()
+    assert poll.interval() == IDLE_POLL_INTERVAL_MS
+
+    now = time.monotonic()
+    monkeypatch.setattr(animation.time, "monotonic", lambda: now)
+    scheduler.polled(changed=False)
+    assert poll.interval() == IDLE_POLL_INTERVAL_MS
+    scheduler.polled(changed=True)
+    assert poll.interval() == 16
+    # Quiet for longer than the hold: back to the slow poll
+    now += animation.POLL_HOLD_SECONDS + 0.1
+    scheduler.polled(changed=False)
+    assert poll.interval() == IDLE_POLL_INTERVAL_MS
+    # Moving always polls at the frame rate
+    scheduler.wake(car_on=True, road_moving=True)
+    assert poll.interval() == 16
+    assert scheduler.summary()["wakeups"]["poll"] == 3
+    assert scheduler.summary()["poll_interval_ms"] == 16
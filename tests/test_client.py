@@ -0,0 +1,45 @@
+from client import DeltaEncoder
+from protocol import ADDR_FUEL, ADDR_RPM, ADDR_SPEED, FLAG_DELTA, FLAG_KEYFRAME, FrameDecoder, encode_frame
+
+
+def apply(state, frames):
+    for frame in frames:
+        for address, value in frame.updates:
+            state[address] = value
+
+
+def test_delta_and_keyframe_round_trip():
+    encoder = DeltaEncoder(keyframe_interval=1.0)
+    decoder = FrameDecoder()
+    received = {}
+
+    def send(batch, now):
+        updates, flags = encoder.encode(batch, now)
+        if updates:
+            data = encode_frame(updates, flags)
+            frames = decoder.feed(data)
+            apply(received, frames)
+        return updates, flags
+
+    # The first batch is a keyframe
+    assert send([(ADDR_SPEED, 50), (ADDR_RPM, 2000)], 0.0) == ([(ADDR_SPEED, 50), (ADDR_RPM, 2000)], FLAG_KEYFRAME)
+    # Unchanged registers are suppressed; only changes go out as deltas
+    assert send([(ADDR_SPEED, 50), (ADDR_RPM, 2100)], 0.1) == ([(ADDR_RPM, 2100)], FLAG_DELTA)
+    assert send([(ADDR_SPEED, 50)], 0.2) == ([], FLAG_DELTA)
+    assert send([(ADDR_FUEL, 70)], 0.3) == ([(ADDR_FUEL, 70)], FLAG_DELTA)
+    assert encoder.suppressed == 2
+    # After the interval the full state is sent again, including registers not in this batch
+    updates, flags = send([(ADDR_SPEED, 55)], 1.0)
+    assert flags == FLAG_KEYFRAME
+    assert dict(updates) == {ADDR_SPEED: 55, ADDR_RPM: 2100, ADDR_FUEL: 70}
+    assert received == encoder.state
+
+    # A receiver that starts over (e.g. a restarted cluster) only needs the next keyframe
+    encoder.reset()
+    fresh = {}
+    updates, flags = encoder.encode([(ADDR_RPM, 2200)], 1.1)
+    assert flags == FLAG_KEYFRAME
+    apply(fresh, FrameDecoder().feed(encode_frame(updates, flags)))
+    assert fresh == {ADDR_SPEED: 55, ADDR_RPM: 2200, ADDR_FUEL: 70}
+    assert encoder.keyframes == 3
+
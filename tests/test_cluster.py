@@ -0,0 +1,23 @@
+import socket
+
+from conftest import wait_for
+from ingest import IngestServer
+from protocol import ADDR_SPEED, encode_frame
+
+
+def test_producer_queued_before_the_widget_is_built(qapp):
+    from main import InstrumentCluster
+
+    # Bind-first startup: a producer's frame is waiting before the cluster exists
+    server = IngestServer("localhost", 0, verbose=False)
+    producer = socket.create_connection(("localhost", server.port))
+    producer.sendall(encode_frame([(ADDR_SPEED, 42)]))
+    cluster = InstrumentCluster(port=None, verbose=False, ingest_server=server)
+    try:
+        assert wait_for(lambda: cluster.registers.value("speed") == 42)
+        assert server.callback_errors == 0
+        assert server.disconnects == 0
+    finally:
+        producer.close()
+        server.stop()
+        cluster.deleteLater()
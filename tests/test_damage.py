@@ -0,0 +1,50 @@
+import time
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QRegion
+
+import damage
+from damage import DamageTracker
+
+
+class Widget:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, rect=None):
+        self.updates.append(rect)
+
+
+def test_only_changed_regions_are_repainted():
+    state = {"speed": 0, "rpm": 0}
+    widget = Widget()
+    tracker = DamageTracker(widget)
+    tracker.track("speed", QRect(0, 0, 10, 10), lambda: state["speed"])
+    tracker.track("rpm", QRect(20, 0, 10, 10), lambda: state["rpm"])
+    assert not tracker.refresh()
+    state["rpm"] = 1000
+    assert tracker.refresh()
+    assert widget.updates == [QRect(20, 0, 10, 10)]
+    assert tracker.pending
+
+
+def test_scaled_rects():
+    tracker = DamageTracker(Widget(), scale=0.25)
+    tracker.track("speed", QRect(300, 175, 400, 310), lambda: 0)
+    assert tracker.rect("speed") == QRect(75, 43, 100, 79)
+
+
+def test_pixel_rate_drops_to_zero_when_idle(monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr(damage.time, "monotonic", lambda: now)
+    tracker = DamageTracker(Widget())
+    now += 0.5
+    tracker.record_paint(QRegion(QRect(0, 0, 100, 10)))
+    now += 0.5
+    tracker.record_paint(QRegion(QRect(0, 0, 100, 10)))
+    assert tracker.pixel_rate() == 2000
+    assert tracker.repainted_pixels == 2000
+    # Nothing painted since: the next window reads as idle, without another paint
+    now += 1.0
+    assert tracker.pixel_rate() == 0
+    assert tracker.repainted_pixels == 2000
@@ -0,0 +1,92 @@
+import os
+import resource
+import socket
+import threading
+
+from conftest import wait_for
+from ingest import IngestServer
+from protocol import ADDR_RPM, ADDR_SPEED, encode_ascii, encode_frame
+
+
+def serve(on_frames=None, on_invalid=None):
+    server = IngestServer("localhost", 0, on_frames=on_frames, on_invalid=on_invalid, verbose=False)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+
+def test_failing_callback_drops_only_that_producer():
+    received = []
+
+    def on_frames(connection, frames):
+        for frame in frames:
+            if frame.updates == [(ADDR_RPM, 0xBAD)]:
+                raise RuntimeError("bad batch")
+            received.extend(frame.updates)
+
+    server, thread = serve(on_frames)
+    try:
+        with socket.create_connection(("localhost", server.port)) as good, \
+                socket.create_connection(("localhost", server.port)) as bad:
+            assert wait_for(lambda: server.connections_accepted == 2)
+            bad.sendall(encode_frame([(ADDR_RPM, 0xBAD)]))
+            assert wait_for(lambda: server.callback_errors == 1)
+            # The failing producer is disconnected...
+            bad.settimeout(5)
+            assert bad.recv(1) == b""
+            # ...and everyone else is still served
+            good.sendall(encode_frame([(ADDR_SPEED, 10)]))
+            assert wait_for(lambda: received == [(ADDR_SPEED, 10)])
+        assert thread.is_alive()
+        assert server.stats()["callback_errors"] == 1
+    finally:
+        server.stop()
+        thread.join(5)
+
+
+def test_failing_invalid_callback_keeps_serving():
+    received = []
+
+    def on_invalid(connection, data):
+        raise ValueError("cannot report")
+
+    server, thread = serve(lambda connection, frames: received.extend(frame.updates[0] for frame in frames), on_invalid)
+    try:
+        with socket.create_connection(("localhost", server.port)) as bad:
+            bad.sendall(b"garbage!garbage!garbage!")
+            assert wait_for(lambda: server.callback_errors == 1)
+        with socket.create_connection(("localhost", server.port)) as good:
+            good.sendall(encode_ascii(ADDR_SPEED, 20))
+            assert wait_for(lambda: received == [(ADDR_SPEED, 20)])
+        assert server.decode_errors >= 1
+    finally:
+        server.stop()
+        thread.join(5)
+
+
+
+def test_accept_error_keeps_serving():
+    received = []
+    server, thread = serve(lambda connection, frames: received.extend(frame.updates[0] for frame in frames))
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    try:
+        with socket.create_connection(("localhost", server.port)) as good, socket.socket() as late:
+            good.sendall(encode_frame([(ADDR_SPEED, 1)]))
+            assert wait_for(lambda: received == [(ADDR_SPEED, 1)])
+
+            # Out of file descriptors: accept() fails with EMFILE
+            resource.setrlimit(resource.RLIMIT_NOFILE, (len(os.listdir("/proc/self/fd")), hard))
+            try:
+                late.connect(("localhost", server.port))
+                assert wait_for(lambda: server.accept_errors >= 1)
+            finally:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+            # Existing producers are still served, and the waiting one gets in
+            good.sendall(encode_frame([(ADDR_SPEED, 2)]))
+            late.sendall(encode_frame([(ADDR_SPEED, 3)]))
+            assert wait_for(lambda: sorted(received) == [(ADDR_SPEED, 1), (ADDR_SPEED, 2), (ADDR_SPEED, 3)])
+        assert thread.is_alive()
+    finally:
+        server.stop()
+        thread.join(5)
@@ -0,0 +1,80 @@
+import multiprocessing
+import socket
+import time
+
+import pytest
+
+from ingest import IngestProcess
+from protocol import ADDR_CAR_STATUS, ADDR_SPEED, encode_frame
+from main import create_ingest_server
+
+
+def test_bind_failure_raises_before_the_gui_is_built():
+    taken = socket.socket()
+    taken.bind(("localhost", 0))
+    taken.listen(1)
+    try:
+        with pytest.raises(OSError):
+            create_ingest_server("localhost", taken.getsockname()[1], ingest_process=True, verbose=False)
+    finally:
+        taken.close()
+
+
+def test_worker_listens_once_created():
+    server = create_ingest_server("localhost", 0, ingest_process=True, verbose=False)
+    try:
+        assert server.port
+        with socket.create_connection(("localhost", server.port)):
+            pass
+    finally:
+        server.stop()
+
+
+def test_later_worker_error_marks_the_server_dead():
+    # A stand-in for the worker's end of the pipe
+    server = IngestProcess.__new__(IngestProcess)
+    server.receiver, sender = multiprocessing.Pipe(duplex=False)
+    server.port = 8080
+    server.alive = True
+    server.error = None
+    server.latest_stats = {}
+    sender.send(("error", "listener closed"))
+    assert server.receive() == ([], [])
+    assert not server.alive
+    assert server.error == "listener closed"
+    assert server.stats()["worker_error"] == "listener closed"
+    with pytest.raises(OSError):
+        server.wait_ready()
+    sender.close()
+    server.receiver.close()
+
+
+def cluster_state_after(qapp, ingest_process, data):
+    from main import InstrumentCluster
+
+    server = create_ingest_server("localhost", 0, ingest_process=ingest_process, verbose=False)
+    cluster = InstrumentCluster(port=None, verbose=False, ingest_server=server)
+    try:
+        with socket.create_connection(("localhost", server.port)) as producer:
+            producer.sendall(data)
+            deadline = time.monotonic() + 5
+            while cluster.registers.value("car_status") != "OFF" and time.monotonic() < deadline:
+                qapp.processEvents()
+                time.sleep(0.005)
+        # Let a last coalesced batch from the worker arrive
+        for _ in range(20):
+            qapp.processEvents()
+            time.sleep(0.005)
+        return cluster.registers.value("car_status"), cluster.registers.value("speed")
+    finally:
+        server.stop()
+        cluster.deleteLater()
+
+
+def test_worker_process_applies_updates_like_the_thread(qapp):
+    # Car on, speed, car off in one read: switching off last must leave speed at 0
+    data = (encode_frame([(ADDR_CAR_STATUS, 1)]) + encode_frame([(ADDR_SPEED, 50)]) + encode_frame([(ADDR_CAR_STATUS, 0)]))
+    threaded = cluster_state_after(qapp, False, data)
+    in_process = cluster_state_after(qapp, True, data)
+    assert threaded == ("OFF", 0)
+    assert in_process == threaded
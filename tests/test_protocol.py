@@ -0,0 +1,86 @@
+from protocol import (ADDR_FUEL, ADDR_RPM, ADDR_SPEED, FLAG_ACK_REQUEST, FLAG_TRACE, FLAG_VEHICLE, FRAME_MAGIC, FrameDecoder,
+                      encode_ascii, encode_frame)
+
+
+def decode(*chunks):
+    decoder = FrameDecoder()
+    frames = []
+    for chunk in chunks:
+        frames.extend(decoder.feed(chunk))
+    return decoder, frames
+
+
+def updates(frames):
+    return [update for frame in frames for update in frame.updates]
+
+
+def test_frame_split_at_every_byte_boundary():
+    data = encode_frame([(ADDR_SPEED, 120), (ADDR_RPM, 4500)], seq=7, sent_ns=123456789, vehicle=3) + encode_ascii(ADDR_FUEL, 60)
+    for split in range(1, len(data)):
+        decoder, frames = decode(data[:split], data[split:])
+        assert updates(frames) == [(ADDR_SPEED, 120), (ADDR_RPM, 4500), (ADDR_FUEL, 60)], split
+        assert (frames[0].seq, frames[0].sent_ns, frames[0].vehicle) == (7, 123456789, 3)
+        assert decoder.errors == 0
+        assert not decoder.buffer
+
+
+def test_frame_fed_one_byte_at_a_time():
+    data = encode_frame([(ADDR_SPEED, 1), (ADDR_RPM, 2)])
+    decoder, frames = decode(*[data[i:i + 1] for i in range(len(data))])
+    assert updates(frames) == [(ADDR_SPEED, 1), (ADDR_RPM, 2)]
+
+
+def test_ascii_messages_run_together():
+    data = b"".join(encode_ascii(ADDR_SPEED, value) for value in (10, 20, 30))
+    decoder, frames = decode(data)
+    assert updates(frames) == [(ADDR_SPEED, 10), (ADDR_SPEED, 20), (ADDR_SPEED, 30)]
+    assert all(frame.flags == 0 for frame in frames)
+    assert decoder.errors == 0
+
+
+def test_ascii_and_binary_mixed_on_one_stream():
+    data = (encode_ascii(ADDR_SPEED, 10) + encode_frame([(ADDR_RPM, 3000)], FLAG_ACK_REQUEST) + b"\r\n"
+            + encode_ascii(ADDR_FUEL, 50) + encode_frame([(ADDR_SPEED, 11)]))
+    decoder, frames = decode(data)
+    assert updates(frames) == [(ADDR_SPEED, 10), (ADDR_RPM, 3000), (ADDR_FUEL, 50), (ADDR_SPEED, 11)]
+    assert frames[1].flags == FLAG_ACK_REQUEST
+    assert decoder.errors == 0
+
+
+def test_resync_after_garbage():
+    # Garbage runs up to the next whitespace or frame start, then decoding carries on
+    data = (b"not a message at all" + b" " + encode_ascii(ADDR_SPEED, 42)
+            + b"ZZZZZZZZZZZZZZZZZZZZ" + encode_frame([(ADDR_RPM, 1000)]))
+    decoder, frames = decode(data)
+    assert updates(frames) == [(ADDR_SPEED, 42), (ADDR_RPM, 1000)]
+    assert decoder.errors >= 2
+    assert not decoder.buffer
+
+
+def test_bad_hex_counts_as_an_error():
+    decoder, frames = decode(b"0000000G 00000001 " + encode_ascii(ADDR_SPEED, 5))
+    assert updates(frames) == [(ADDR_SPEED, 5)]
+    assert decoder.errors == 1
+
+
+def test_trace_and_vehicle_header_offsets():
+    for seq, vehicle in ((5, None), (None, 9), (0xFFFFFFFF, 0xFFFF)):
+        data = encode_frame([(ADDR_SPEED, 77)], seq=seq, sent_ns=999 if seq is not None else None, vehicle=vehicle)
+        assert data[0] == FRAME_MAGIC
+        decoder, frames = decode(data)
+        frame, = frames
+        assert frame.updates == [(ADDR_SPEED, 77)]
+        assert bool(frame.flags & FLAG_TRACE) == (seq is not None)
+        assert bool(frame.flags & FLAG_VEHICLE) == (vehicle is not None)
+        assert frame.seq == seq
+        assert frame.sent_ns == (999 if seq is not None else None)
+        assert frame.vehicle == vehicle
+
+
+def test_partial_frame_is_kept_until_complete():
+    data = encode_frame([(ADDR_SPEED, 1)] * 3)
+    decoder = FrameDecoder()
+    assert decoder.feed(data[:-1]) == []
+    assert len(decoder.buffer) == len(data) - 1
+    frame, = decoder.feed(data[-1:])
+    assert frame.updates == [(ADDR_SPEED, 1)] * 3
@@ -0,0 +1,65 @@
+import pytest
+
+from registers import Register, RegisterBank
+
+
+def make_bank():
+    return RegisterBank([
+        Register(0x00, "car_status", "Car status", 0, 2, decode=lambda raw: "ON" if raw == 1 else "OFF"),
+        Register(0x01, "speed", "Speed", 0, 240),
+        Register(0x03, "fuel_level", "Fuel level", 0, 100),
+    ])
+
+
+def test_decode_and_value():
+    bank = make_bank()
+    assert bank.value("car_status") is None
+    assert bank.write(0x00, 1)
+    assert bank.value("car_status") == "ON"
+    assert bank.write_named("speed", 120)
+    assert bank.value("speed") == 120
+
+
+def test_out_of_range_is_rejected():
+    bank = make_bank()
+    rejected = []
+    bank.on_reject = lambda register, raw: rejected.append((register.name, raw))
+    bank.write(0x01, 100)
+    assert not bank.write(0x01, 241)
+    assert not bank.write(0x03, -1)
+    assert bank.value("speed") == 100
+    assert rejected == [("speed", 241), ("fuel_level", -1)]
+    assert bank.rejected == 2
+    assert bank.rejected_by_address[0x01] == 1
+    assert bank.rejected_by_address[0x03] == 1
+
+
+def test_unknown_addresses_are_counted():
+    bank = make_bank()
+    # A gap in the address space, past the end, and negative
+    assert not bank.write(0x02, 1)
+    assert not bank.write(0x10000, 1)
+    assert not bank.write(-1, 1)
+    assert bank.unknown == 3
+    assert bank.rejected == 0
+
+
+def test_callbacks_only_on_change():
+    bank = make_bank()
+    every = []
+    speed = []
+    bank.on_change(lambda register, value: every.append((register.name, value)))
+    bank.on_change(lambda register, value: speed.append(value), "speed")
+    bank.write(0x01, 50)
+    bank.write(0x01, 50)
+    bank.write(0x01, 60)
+    # Different raw values decoding to the same value don't count as a change either
+    bank.write(0x00, 0)
+    assert bank.write(0x00, 2)
+    assert speed == [50, 60]
+    assert every == [("speed", 50), ("speed", 60), ("car_status", "OFF")]
+
+
+def test_duplicate_address_is_an_error():
+    with pytest.raises(ValueError):
+        RegisterBank([Register(0x01, "speed", "Speed"), Register(0x01, "rpm", "RPM")])
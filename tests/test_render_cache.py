@@ -0,0 +1,52 @@
+from PyQt5.QtCore import QRectF, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter, QPen
+
+from render_cache import NeedleAtlas
+
+
+def paint_needle(painter):
+    painter.setPen(QPen(Qt.black, 2))
+    painter.drawLine(0, 0, 0, -190)
+    painter.setPen(QPen(QColor(255, 255, 255), 3))
+    painter.drawLine(0, 0, 0, -175)
+
+
+def render(atlas, angle, ratio, whole):
+    image = QImage(int(420 * ratio), int(420 * ratio), QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.darkBlue)
+    image.setDevicePixelRatio(ratio)
+    painter = QPainter(image)
+    if ratio < 1:
+        painter.scale(ratio, ratio)
+    if whole:
+        # One band as tall as the sprite: the uncropped sprite
+        atlas.band_height = 1 << 16
+    atlas.draw(painter, 210, 210, angle, "needle", QRectF(-3, -193, 6, 196), paint_needle, ratio)
+    painter.end()
+    return image
+
+
+def test_banded_sprites_match_whole_sprites(qapp):
+    for ratio in (1.0, 2.0, 1.5, 0.25):
+        for angle in (-120.0, -45.0, -0.5, 0.0, 13.0, 51.5, 90.0, 119.5):
+            banded = render(NeedleAtlas(), angle, ratio, whole=False)
+            whole = render(NeedleAtlas(), angle, ratio, whole=True)
+            assert banded == whole, (ratio, angle)
+
+
+def test_full_sweep_is_built_once_and_fits_budget(qapp):
+    # Every angle of the cluster's gauge and fuel needles, twice
+    atlas = NeedleAtlas()
+    image = QImage(420, 420, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    for _ in range(2):
+        for index in range(-240, 241):
+            atlas.draw(painter, 210, 210, index * 0.5, "gauge", QRectF(-3, -193, 6, 196), paint_needle)
+        for index in range(-70, 351):
+            atlas.draw(painter, 210, 210, index * 0.5, "fuel", QRectF(-2, -118, 4, 120), lambda sprite: sprite.drawLine(0, 0, 0, -116))
+    painter.end()
+    assert atlas.builds == 481 + 421
+    assert len(atlas.sprites) == atlas.builds
+    assert atlas.bytes < 12 * 1024 * 1024
+    atlas.invalidate()
+    assert atlas.bytes == 0
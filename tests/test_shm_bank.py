@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from protocol import ADDR_CAR_STATUS, ADDR_RPM, ADDR_SPEED
+from shm_bank import SEQ_OFFSET, SHM_SEQ, SharedRegisterBank, SharedRegisterWriter
+
+
+@pytest.fixture
+def bank():
+    bank = SharedRegisterBank(f"ictest_{os.getpid()}", slots=8)
+    yield bank
+    bank.close()
+
+
+@pytest.fixture
+def writer(bank):
+    writer = SharedRegisterWriter(bank.name)
+    yield writer
+    writer.close()
+
+
+def test_nothing_to_read_until_written(bank, writer):
+    assert bank.read() == []
+    writer.write_many([(ADDR_SPEED, 50), (ADDR_RPM, 2000)])
+    assert bank.read() == [(ADDR_SPEED, 50), (ADDR_RPM, 2000)]
+    # Same sequence number: nothing new
+    assert bank.read() == []
+    assert bank.reads == 1
+
+
+def test_only_written_slots_are_forwarded(bank, writer):
+    writer.write(ADDR_RPM, 0)
+    # The other slots hold zeros too, but were never written
+    assert bank.read() == [(ADDR_RPM, 0)]
+    assert writer.written == 1 << ADDR_RPM
+    with pytest.raises(ValueError):
+        writer.write(8, 1)
+    # The batch is still closed off, so the reader isn't left waiting on an odd sequence
+    assert SHM_SEQ.unpack_from(bank.shm.buf, SEQ_OFFSET)[0] % 2 == 0
+
+
+def test_reader_retries_while_a_write_is_in_progress(bank, writer):
+    writer.write(ADDR_SPEED, 10)
+    assert bank.read() == [(ADDR_SPEED, 10)]
+    # A writer that has bumped the sequence to odd and not finished yet
+    SHM_SEQ.pack_into(bank.shm.buf, SEQ_OFFSET, writer.seq + 1)
+    assert bank.read() == []
+    assert bank.retries > 0
+    # Once the write completes, the reader picks it up
+    SHM_SEQ.pack_into(bank.shm.buf, SEQ_OFFSET, writer.seq)
+    writer.write(ADDR_SPEED, 11)
+    assert bank.read() == [(ADDR_SPEED, 11)]
+
+
+def test_same_value_written_again_is_forwarded(bank, writer):
+    writer.write(ADDR_SPEED, 50)
+    assert bank.read() == [(ADDR_SPEED, 50)]
+    writer.write(ADDR_SPEED, 50)
+    assert bank.read() == [(ADDR_SPEED, 50)]
+
+
+def test_writes_between_reads_keep_their_order(bank, writer):
+    writer.write_many([(ADDR_CAR_STATUS, 1), (ADDR_SPEED, 50)])
+    writer.write(ADDR_CAR_STATUS, 0)
+    assert bank.read() == [(ADDR_SPEED, 50), (ADDR_CAR_STATUS, 0)]
+
+
+def test_new_writer_continues_the_stamps(bank, writer):
+    writer.write(ADDR_SPEED, 5)
+    assert bank.read() == [(ADDR_SPEED, 5)]
+    second = SharedRegisterWriter(bank.name)
+    second.write(ADDR_SPEED, 5)
+    second.close()
+    assert bank.read() == [(ADDR_SPEED, 5)]
+
+
+def test_cluster_sees_speed_again_after_car_off(qapp, bank, writer):
+    from main import InstrumentCluster
+
+    cluster = InstrumentCluster(port=None, verbose=False, shared_bank=bank)
+    try:
+        for batch in ([(ADDR_CAR_STATUS, 1), (ADDR_SPEED, 50)], [(ADDR_CAR_STATUS, 0)], [(ADDR_CAR_STATUS, 1), (ADDR_SPEED, 50)]):
+            writer.write_many(batch)
+            cluster.read_shared_bank()
+        assert cluster.registers.value("car_status") == "ON"
+        assert cluster.registers.value("speed") == 50
+
+        # On, speed and off between two polls end up off, as they would over a socket
+        writer.write_many([(ADDR_CAR_STATUS, 1), (ADDR_SPEED, 60)])
+        writer.write(ADDR_CAR_STATUS, 0)
+        cluster.read_shared_bank()
+        assert cluster.registers.value("car_status") == "OFF"
+        assert cluster.registers.value("speed") == 0
+    finally:
+        cluster.deleteLater()
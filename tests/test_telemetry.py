@@ -0,0 +1,77 @@
+import socket
+
+from conftest import wait_for
+from ingest import IngestServer
+from protocol import ADDR_FUEL, ADDR_SPEED, encode_ascii
+from telemetry import LOG_HEADER, LOG_RECORD, TelemetryRecorder, TelemetryReplay
+
+
+def test_record_and_replay_round_trip(tmp_path):
+    path = str(tmp_path / "drive.ictl")
+    recorder = TelemetryRecorder(path)
+    recorder.record([(ADDR_SPEED, 50), (ADDR_FUEL, 80)], timestamp=100.0)
+    recorder.record([(ADDR_SPEED, 55)], timestamp=100.5)
+    recorder.close()
+    assert recorder.records == 3
+
+    # Appending to an existing log keeps the header and adds to the records
+    recorder = TelemetryRecorder(path)
+    recorder.record([(ADDR_SPEED, 60)], timestamp=101.0)
+    recorder.close()
+
+    replay = TelemetryReplay(path)
+    assert replay.count == 4
+    assert list(replay.records()) == [(100.0, ADDR_SPEED, 50), (100.0, ADDR_FUEL, 80), (100.5, ADDR_SPEED, 55),
+                                      (101.0, ADDR_SPEED, 60)]
+    batches = []
+    assert replay.play(batches.append, speed=0) == 4
+    replay.close()
+    # Updates recorded together are replayed together
+    assert batches == [[(ADDR_SPEED, 50), (ADDR_FUEL, 80)], [(ADDR_SPEED, 55)], [(ADDR_SPEED, 60)]]
+
+
+def test_replay_ignores_partial_trailing_record(tmp_path):
+    path = str(tmp_path / "crash.ictl")
+    recorder = TelemetryRecorder(path)
+    recorder.record([(ADDR_SPEED, 10), (ADDR_SPEED, 20)], timestamp=1.0)
+    recorder.close()
+    with open(path, "r+b") as log:
+        log.truncate(LOG_HEADER.size + LOG_RECORD.size + 3)
+    replay = TelemetryReplay(path)
+    assert list(replay.records()) == [(1.0, ADDR_SPEED, 10)]
+    replay.close()
+
+
+def test_unpackable_update_is_dropped_not_raised(tmp_path):
+    recorder = TelemetryRecorder(str(tmp_path / "bad.ictl"))
+    recorder.record([(0x10000, 1)])
+    recorder.record([(ADDR_SPEED, 1)])
+    recorder.close()
+    assert recorder.failures == 1
+    assert recorder.records == 1
+
+
+def test_out_of_range_ascii_address_while_recording(qapp, tmp_path):
+    from main import InstrumentCluster
+
+    path = str(tmp_path / "live.ictl")
+    recorder = TelemetryRecorder(path)
+    server = IngestServer("localhost", 0, verbose=False)
+    cluster = InstrumentCluster(port=None, recorder=recorder, verbose=False, ingest_server=server)
+    try:
+        with socket.create_connection(("localhost", server.port)) as sock:
+            # 0x00010000 doesn't fit the log's 16-bit address and isn't a register either
+            sock.sendall(encode_ascii(0x00010000, 1))
+            assert wait_for(lambda: cluster.registers.unknown == 1)
+            # The server is still delivering, and only the accepted update reaches the log
+            sock.sendall(encode_ascii(ADDR_SPEED, 42))
+            assert wait_for(lambda: recorder.records == 1)
+        assert recorder.failures == 0
+    finally:
+        server.stop()
+        recorder.close()
+        cluster.deleteLater()
+
+    replay = TelemetryReplay(path)
+    assert [(address, value) for _, address, value in replay.records()] == [(ADDR_SPEED, 42)]
+    replay.close()
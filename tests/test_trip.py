@@ -0,0 +1,69 @@
+import time
+
+from protocol import ADDR_CAR_STATUS, ADDR_SPEED
+from trip import TripComputer
+
+
+def test_rolling_average_and_max_rpm():
+    trip = TripComputer(interval=1.0, window=3)
+    start = trip._sample_start
+    trip.update("speed", 60, now=start)
+    trip.update("rpm", 3000, now=start + 0.5)
+    trip.update("rpm", 2000, now=start + 1.5)
+    summary = trip.summary(now=start + 2.0)
+    assert summary["window_seconds"] == 2.0
+    assert summary["average_speed"] == 60
+    assert summary["max_rpm"] == 3000
+    # Once the 3000 RPM sample leaves the window, the maximum drops with it
+    summary = trip.summary(now=start + 5.0)
+    assert summary["max_rpm"] == 2000
+    assert abs(summary["total_distance_km"] - 60 * 5 / 3600) < 1e-9
+
+
+def test_trip_text_refreshes_while_idle(qapp, monkeypatch):
+    from main import InstrumentCluster
+
+    cluster = InstrumentCluster(port=None, verbose=False)
+    try:
+        cluster.ingest_updates([(ADDR_CAR_STATUS, 1), (ADDR_SPEED, 60)])
+        cluster.apply_snapshot()
+        assert cluster.trip_timer.isActive()
+        assert cluster.trip_text[0] == "AVG -- km/h"
+
+        # No new data and no frames: only the trip timer moves the figures on
+        later = time.monotonic() + 2.5
+        monkeypatch.setattr(time, "monotonic", lambda: later)
+        cluster.damage.pending = False
+        cluster.trip_timer.timeout.emit()
+        assert cluster.trip_text[0] == "AVG 60 km/h"
+        assert cluster.damage.pending
+
+        monkeypatch.undo()
+        cluster.ingest_updates([(ADDR_CAR_STATUS, 0)])
+        cluster.last_snapshot_time = 0.0
+        cluster.apply_snapshot()
+        assert not cluster.trip_timer.isActive()
+    finally:
+        cluster.deleteLater()
+
+
+def test_fuel_rate_line(qapp, monkeypatch):
+    from main import InstrumentCluster
+
+    cluster = InstrumentCluster(port=None, verbose=False)
+    try:
+        assert cluster.trip_text[3] == "FUEL -- %/100km"
+        start = cluster.trip._sample_start
+        # 120 km/h for a minute (2 km) using 1% of the tank
+        cluster.trip.update("fuel_level", 80, now=start)
+        cluster.trip.update("speed", 120, now=start)
+        cluster.trip.update("fuel_level", 79, now=start + 59.5)
+        monkeypatch.setattr(time, "monotonic", lambda: start + 60)
+        cluster.damage.widget = type("Widget", (), {"update": lambda self, rect: updates.append(rect)})()
+        updates = []
+        cluster.refresh_trip()
+        assert cluster.trip_text[3] == "FUEL 50.0 %/100km"
+        # Only the trip lines are repainted, not the whole fuel gauge
+        assert updates == [cluster.damage.rect("trip_average"), cluster.damage.rect("trip_fuel")]
+    finally:
+        cluster.deleteLater()
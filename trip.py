@@ -0,0 +1,177 @@
+import threading
+import time
+from array import array
+from collections import deque
+
+TRIP_INTERVAL = 1.0  # Seconds per trip sample
+TRIP_WINDOW = 300  # Samples the rolling aggregates cover (five minutes)
+MIN_RANGE_DISTANCE = 0.5  # km driven in the window before a range estimate is shown
+
+
+class RingBuffer:
+    # Fixed-size time series in a preallocated array; once full, each append
+    # overwrites the oldest sample and returns it so running sums can drop it
+    def __init__(self, capacity, typecode="d"):
+        self.capacity = capacity
+        self.data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self.start = 0
+        self.count = 0
+
+    def append(self, value):
+        data = self.data
+        if self.count < self.capacity:
+            data[(self.start + self.count) % self.capacity] = value
+            self.count += 1
+            return None
+        evicted = data[self.start]
+        data[self.start] = value
+        self.start = (self.start + 1) % self.capacity
+        return evicted
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # Oldest first
+        data = self.data
+        for i in range(self.count):
+            yield data[(self.start + i) % self.capacity]
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+
+
+class TripComputer:
+    # Samples speed, RPM and fuel every `interval` seconds into ring buffers and
+    # keeps the rolling aggregates over the last `window` samples up to date as
+    # samples are added and evicted, so reading them costs the same however
+    # long the history is. Written from the ingestion path, read by the GUI.
+    def __init__(self, interval=TRIP_INTERVAL, window=TRIP_WINDOW):
+        self.interval = interval
+        self.window = window
+        self.speeds = RingBuffer(window)  # average km/h over each sample
+        self.max_rpms = RingBuffer(window)  # highest RPM seen in each sample
+        self.distances = RingBuffer(window)  # km driven in each sample
+        self.fuel_used = RingBuffer(window)  # fuel percentage points used in each sample
+        self.speed_sum = 0.0
+        self.distance_sum = 0.0
+        self.fuel_used_sum = 0.0
+        # Monotonic queue of (sample number, max RPM): the window maximum is at the front
+        self.rpm_peaks = deque()
+        self.samples = 0
+        self.trip_distance = 0.0
+        self.trip_fuel_used = 0.0
+        self.speed = 0.0
+        self.rpm = 0
+        self.fuel_level = None
+        self._lock = threading.Lock()
+        self._reset_sample(time.monotonic())
+
+    def _reset_sample(self, now):
+        self._sample_start = now
+        self._last_time = now
+        self._speed_area = 0.0  # km/h * s
+        self._rpm_max = self.rpm
+        self._fuel_start = self.fuel_level
+
+    def update(self, name, value, now=None):
+        if name not in ("speed", "rpm", "fuel_level"):
+            return
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+            self._integrate(now)
+            if name == "speed":
+                self.speed = value
+            elif name == "rpm":
+                self.rpm = value
+                if value > self._rpm_max:
+                    self._rpm_max = value
+            else:
+                if self._fuel_start is None:
+                    self._fuel_start = value
+                self.fuel_level = value
+
+    def _integrate(self, now):
+        self._speed_area += self.speed * (now - self._last_time)
+        self._last_time = now
+
+    def _advance(self, now):
+        # Close every sample that ended before `now`, holding the latest values
+        # across gaps. A gap longer than the window only refills the window once.
+        end = self._sample_start + self.interval
+        if now < end:
+            return
+        gap = int((now - end) / self.interval)
+        if gap >= self.window:
+            self._integrate(end)
+            self._close_sample()
+            # The skipped samples would only be evicted again, but still count towards the trip
+            skipped = (gap - self.window + 1) * self.interval
+            self.trip_distance += self.speed * skipped / 3600
+            end += skipped
+            self._reset_sample(end)
+            end += self.interval
+        while now >= end:
+            self._integrate(end)
+            self._close_sample()
+            self._reset_sample(end)
+            end += self.interval
+
+    def _close_sample(self):
+        speed = self._speed_area / self.interval
+        distance = self._speed_area / 3600
+        # A rising level is a refuel, not negative consumption
+        fuel_used = 0.0
+        if self._fuel_start is not None and self.fuel_level is not None:
+            fuel_used = max(0.0, self._fuel_start - self.fuel_level)
+
+        evicted = self.speeds.append(speed)
+        if evicted is not None:
+            self.speed_sum -= evicted
+        self.speed_sum += speed
+        evicted = self.distances.append(distance)
+        if evicted is not None:
+            self.distance_sum -= evicted
+        self.distance_sum += distance
+        evicted = self.fuel_used.append(fuel_used)
+        if evicted is not None:
+            self.fuel_used_sum -= evicted
+        self.fuel_used_sum += fuel_used
+        self.max_rpms.append(self._rpm_max)
+
+        sample = self.samples
+        peaks = self.rpm_peaks
+        while peaks and peaks[-1][1] <= self._rpm_max:
+            peaks.pop()
+        peaks.append((sample, self._rpm_max))
+        if peaks[0][0] <= sample - self.window:
+            peaks.popleft()
+        self.samples += 1
+        self.trip_distance += distance
+        self.trip_fuel_used += fuel_used
+
+    def summary(self, now=None):
+        # Rolling figures over the window, plus trip totals; None until known
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+            count = len(self.speeds)
+            max_rpm = max(self._rpm_max, self.rpm_peaks[0][1]) if self.rpm_peaks else self._rpm_max
+            distance = self.distance_sum
+            fuel_used = self.fuel_used_sum
+            window_hours = count * self.interval / 3600
+            per_km = fuel_used / distance if distance >= MIN_RANGE_DISTANCE and fuel_used > 0 else None
+            return {
+                "window_seconds": count * self.interval,
+                "average_speed": self.speed_sum / count if count else None,
+                "max_rpm": max_rpm,
+                "fuel_per_hour": fuel_used / window_hours if count else None,
+                "fuel_per_100km": per_km * 100 if per_km is not None else None,
+                "range_km": self.fuel_level / per_km if per_km is not None and self.fuel_level is not None else None,
+                "total_distance_km": self.trip_distance,
+                "total_fuel_used": self.trip_fuel_used,
+            }